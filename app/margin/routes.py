@@ -6,7 +6,7 @@ from app.models import (
     MarginRequirement, TradeQuality, MarginTracker,
     TradingAccount, Strategy, StrategyLeg
 )
-from app.utils.margin_calculator import MarginCalculator
+from app.utils.margin_calculator import MarginCalculator, ManualAccount
 from app.utils.rate_limiter import api_rate_limit, heavy_rate_limit
 from datetime import datetime
 import logging
@@ -162,6 +162,7 @@ def requirements():
                 margin_req.futures_non_expiry = float(data.get('futures_non_expiry', 215000))
 
             db.session.commit()
+            MarginCalculator.clear_cache(current_user.id)
 
             return jsonify({
                 'status': 'success',
@@ -252,6 +253,7 @@ def qualities():
                 quality.margin_source = quality_data.get('margin_source', 'available')
 
             db.session.commit()
+            MarginCalculator.clear_cache(current_user.id)
 
             return jsonify({
                 'status': 'success',
@@ -353,16 +355,10 @@ def calculate_lots():
             }), 400
 
         # Calculate lot size with provided margin
-        calculator = MarginCalculator(current_user.id)
+        calculator = MarginCalculator.for_user(current_user.id)
 
-        # Create a dummy account object for calculation (we only need margin)
-        class DummyAccount:
-            def __init__(self, margin):
-                self.available_margin = margin
-                self.id = 0
-                self.account_name = "Manual Calculation"
-
-        dummy_account = DummyAccount(available_margin)
+        # Create a manual account object for calculation (we only need margin)
+        dummy_account = ManualAccount(available_margin)
 
         # Get quality percentage from quality grade
         quality = calculator.trade_qualities.get(quality_grade)
@@ -452,7 +448,7 @@ def tracker():
     ).all()
 
     trackers = []
-    calculator = MarginCalculator(current_user.id)
+    calculator = MarginCalculator.for_user(current_user.id)
 
     for account in accounts:
         # Get or create tracker
@@ -473,6 +469,7 @@ def tracker():
             'account': account,
             'tracker': tracker
         })
+    calculator.close()
 
     return render_template('margin/tracker.html',
                          trackers=trackers)
@@ -584,12 +581,13 @@ def validate_strategy():
             }), 400
 
         # Validate margin
-        calculator = MarginCalculator(current_user.id)
+        calculator = MarginCalculator.for_user(current_user.id)
         validation_results = calculator.validate_margin_for_strategy(
             strategy_legs=legs,
             accounts=accounts,
             quality_grade=quality_grade
         )
+        calculator.close()
 
         # Determine overall feasibility
         all_feasible = all(
@@ -659,6 +657,7 @@ def update_trade_quality(quality_grade):
 
         quality.updated_at = datetime.utcnow()
         db.session.commit()
+        MarginCalculator.clear_cache(current_user.id)
 
         logger.debug(f"Updated trade quality {quality_grade} for user {current_user.id}")
 
@@ -703,6 +702,7 @@ def delete_trade_quality(quality_grade):
 
         db.session.delete(quality)
         db.session.commit()
+        MarginCalculator.clear_cache(current_user.id)
 
         logger.debug(f"Deleted trade quality {quality_grade} for user {current_user.id}")
 
@@ -776,6 +776,7 @@ def update_option_buying_premium():
             sensex_req.sensex_option_buying_premium = float(sensex_option_buying_premium)
 
         db.session.commit()
+        MarginCalculator.clear_cache(current_user.id)
 
         logger.debug(f"Updated option buying premium for user {current_user.id}: NIFTY/BN={option_buying_premium}, SENSEX={sensex_option_buying_premium}")
 
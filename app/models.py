@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from cryptography.fernet import Fernet
@@ -31,6 +32,16 @@ else:
 cipher_suite = Fernet(ENCRYPTION_KEY)
 
 
+@lru_cache(maxsize=256)
+def _decrypt_api_key(api_key_encrypted):
+    """
+    Decrypt a stored API key, cached by ciphertext: get_api_key() runs on every
+    order, poll and quote, and set_api_key() writes a new ciphertext, so a
+    changed key is never served from the cache
+    """
+    return cipher_suite.decrypt(api_key_encrypted.encode()).decode()
+
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
@@ -105,8 +116,7 @@ class TradingAccount(db.Model):
     def get_api_key(self):
         """Decrypt and return API key"""
         if self.api_key_encrypted:
-            decrypted = cipher_suite.decrypt(self.api_key_encrypted.encode())
-            return decrypted.decode()
+            return _decrypt_api_key(self.api_key_encrypted)
         return None
     
     def __repr__(self):
@@ -511,6 +521,12 @@ class StrategyExecution(db.Model):
     account = db.relationship('TradingAccount')
     leg = db.relationship('StrategyLeg')
 
+    # Pending order recovery/sync filter on status with an order_id set
+    # (added to existing databases by migrate/upgrade/011)
+    __table_args__ = (
+        db.Index('ix_strategy_executions_status_order_id', 'status', 'order_id'),
+    )
+
     def __repr__(self):
         return f'<StrategyExecution {self.symbol} {self.status}>'
 
@@ -578,7 +594,10 @@ class TradingSettings(db.Model):
     
     @staticmethod
     def get_or_create_defaults(user_id):
-        """Create default settings for NIFTY, BANKNIFTY, and SENSEX if they don't exist"""
+        """
+        Create default settings for NIFTY, BANKNIFTY, and SENSEX if they don't exist.
+        Returns the user's active settings keyed by symbol.
+        """
         # Lot sizes: current month and next month (Jan 2025 onwards for NSE)
         # BSE (SENSEX) has no lot size change
         # Freeze quantities are based on exchange rules
@@ -589,13 +608,15 @@ class TradingSettings(db.Model):
             {'symbol': 'SENSEX', 'lot_size': 20, 'next_month_lot_size': 20, 'freeze_quantity': 1000, 'max_lots_per_order': 50},
         ]
 
-        for default in defaults:
-            setting = TradingSettings.query.filter_by(
-                user_id=user_id,
-                symbol=default['symbol']
-            ).first()
+        existing = {
+            setting.symbol: setting
+            for setting in TradingSettings.query.filter_by(user_id=user_id).all()
+        }
+        # Collect active rows before commit expires their attributes
+        settings = {symbol: setting for symbol, setting in existing.items() if setting.is_active}
 
-            if not setting:
+        for default in defaults:
+            if default['symbol'] not in existing:
                 setting = TradingSettings(
                     user_id=user_id,
                     symbol=default['symbol'],
@@ -605,8 +626,10 @@ class TradingSettings(db.Model):
                     max_lots_per_order=default['max_lots_per_order']
                 )
                 db.session.add(setting)
+                settings[default['symbol']] = setting
 
         db.session.commit()
+        return settings
 
 class MarginRequirement(db.Model):
     __tablename__ = 'margin_requirements'
@@ -658,7 +681,10 @@ class MarginRequirement(db.Model):
 
     @staticmethod
     def get_or_create_defaults(user_id):
-        """Create default margin requirements if they don't exist"""
+        """
+        Create default margin requirements if they don't exist.
+        Returns the user's active margin requirements keyed by instrument.
+        """
         defaults = [
             {
                 'instrument': 'NIFTY',
@@ -692,20 +718,24 @@ class MarginRequirement(db.Model):
             }
         ]
 
-        for default in defaults:
-            margin = MarginRequirement.query.filter_by(
-                user_id=user_id,
-                instrument=default['instrument']
-            ).first()
+        existing = {
+            margin.instrument: margin
+            for margin in MarginRequirement.query.filter_by(user_id=user_id).all()
+        }
+        # Collect active rows before commit expires their attributes
+        requirements = {instrument: margin for instrument, margin in existing.items() if margin.is_active}
 
-            if not margin:
+        for default in defaults:
+            if default['instrument'] not in existing:
                 margin = MarginRequirement(
                     user_id=user_id,
                     **default
                 )
                 db.session.add(margin)
+                requirements[default['instrument']] = margin
 
         db.session.commit()
+        return requirements
 
 class TradeQuality(db.Model):
     __tablename__ = 'trade_qualities'
@@ -736,7 +766,10 @@ class TradeQuality(db.Model):
 
     @staticmethod
     def get_or_create_defaults(user_id):
-        """Create default trade qualities if they don't exist"""
+        """
+        Create default trade qualities if they don't exist.
+        Returns the user's active trade qualities keyed by grade.
+        """
         defaults = [
             {
                 'quality_grade': 'A',
@@ -758,11 +791,15 @@ class TradeQuality(db.Model):
             }
         ]
 
+        existing = {
+            quality.quality_grade: quality
+            for quality in TradeQuality.query.filter_by(user_id=user_id).all()
+        }
+        # Collect active rows before commit expires their attributes
+        qualities = {grade: quality for grade, quality in existing.items() if quality.is_active}
+
         for default in defaults:
-            quality = TradeQuality.query.filter_by(
-                user_id=user_id,
-                quality_grade=default['quality_grade']
-            ).first()
+            quality = existing.get(default['quality_grade'])
 
             if not quality:
                 quality = TradeQuality(
@@ -770,6 +807,7 @@ class TradeQuality(db.Model):
                     **default
                 )
                 db.session.add(quality)
+                qualities[default['quality_grade']] = quality
             else:
                 # Fix existing incorrect labels (Grade A was 'conservative', Grade C was 'aggressive')
                 if quality.quality_grade == 'A' and quality.risk_level == 'conservative':
@@ -780,6 +818,7 @@ class TradeQuality(db.Model):
                     quality.description = default['description']
 
         db.session.commit()
+        return qualities
 
 class MarginTracker(db.Model):
     __tablename__ = 'margin_trackers'
@@ -7,6 +7,7 @@ from app.utils.openalgo_client import ExtendedOpenAlgoAPI
 from app.utils.option_chain import OptionChainManager
 from app.utils.websocket_manager import ProfessionalWebSocketManager
 from app.utils.background_service import option_chain_service
+from app.utils.position_monitor import position_monitor
 from app.utils.session_manager import session_manager
 from datetime import datetime
 from app.utils.time_utils import format_timestamp_to_ist
@@ -35,6 +36,13 @@ def get_selected_accounts():
         # Multi-account view
         return current_user.get_active_accounts()
 
+def _get_option_chain_manager(underlying, expiry):
+    """Return the background service's live manager for this chain, or a standalone one"""
+    manager = option_chain_service.active_managers.get(f"{underlying}_{expiry}")
+    if manager is None:
+        manager = OptionChainManager(underlying, expiry)
+    return manager
+
 @trading_bp.route('/funds')
 @login_required
 def funds():
@@ -398,8 +406,8 @@ def option_chain():
                 if expiries:
                     expiry = expiries[0]  # Use nearest expiry
         
-        # Initialize option chain manager
-        option_manager = OptionChainManager(underlying, expiry)
+        # Reuse the live manager if the background service runs this chain
+        option_manager = _get_option_chain_manager(underlying, expiry)
         option_manager.initialize(client)
         
         # Get option chain data
@@ -451,7 +459,7 @@ def api_option_chain(underlying):
                     expiry = expiries[0]
         
         # Get option chain manager instance
-        option_manager = OptionChainManager(underlying, expiry)
+        option_manager = _get_option_chain_manager(underlying, expiry)
         
         if not option_manager.is_active():
             option_manager.initialize(client)
@@ -531,10 +539,8 @@ def option_chain_stream(underlying):
                                 # print(f"[SSE] Started manager after failover for {manager_key}")
                 
                 if manager:
-                    chain_data = manager.get_option_chain()
-
                     # Send as server-sent event
-                    data_json = json.dumps(chain_data)
+                    data_json = manager.get_option_chain_json().decode()
                     yield f"data: {data_json}\n\n"
                 else:
                     yield f"data: {json.dumps({'status': 'inactive', 'message': f'Option chain not active for {underlying} {expiry or ""}'})}\n\n"
@@ -686,15 +692,15 @@ def option_chain_sse():
     def generate():
         """Generate SSE stream"""
         # Get option chain manager
-        option_manager = OptionChainManager(underlying, expiry)
+        option_manager = _get_option_chain_manager(underlying, expiry)
         
         while True:
             try:
-                # Get latest option chain data
-                chain_data = option_manager.get_option_chain()
+                # Get latest option chain data, encoded
+                data_json = option_manager.get_option_chain_json().decode()
                 
                 # Send as SSE
-                yield f"data: {json.dumps(chain_data)}\n\n"
+                yield f"data: {data_json}\n\n"
                 
                 # Wait before next update
                 time.sleep(1)  # Update every second
@@ -790,6 +796,7 @@ def add_holiday():
             
             db.session.add(holiday)
             db.session.commit()
+            position_monitor.invalidate_trading_hours()
             flash(f'Holiday "{holiday_name}" added successfully!', 'success')
             
     except Exception as e:
@@ -816,6 +823,7 @@ def delete_holiday(holiday_id):
         
         db.session.delete(holiday)
         db.session.commit()
+        position_monitor.invalidate_trading_hours()
         
         flash(f'Holiday "{holiday_name}" deleted successfully!', 'success')
         
@@ -875,6 +883,7 @@ def update_session(session_id):
             session.end_time = datetime.strptime(data['end_time'], '%H:%M').time()
         
         db.session.commit()
+        position_monitor.invalidate_trading_hours()
         
         # Restart background service to apply changes
         option_chain_service.schedule_market_hours()
@@ -941,6 +950,7 @@ def update_sessions():
                 db.session.add(new_session)
         
         db.session.commit()
+        position_monitor.invalidate_trading_hours()
         
         # Restart background service to apply changes
         option_chain_service.schedule_market_hours()
@@ -968,6 +978,7 @@ def toggle_template(template_id):
         template = TradingHoursTemplate.query.get_or_404(template_id)
         template.is_active = not template.is_active
         db.session.commit()
+        position_monitor.invalidate_trading_hours()
         
         return jsonify({'status': 'success', 'is_active': template.is_active})
         
@@ -1840,20 +1851,16 @@ def risk_status_stream():
 
     def generate():
         import traceback
-        refresh_counter = 0
         while True:
             try:
                 # Use app context for database operations
                 with app.app_context():
-                    # Refresh positions every 5 seconds to catch any missed subscriptions
-                    refresh_counter += 1
-                    if refresh_counter >= 5:
-                        try:
-                            from app.utils.position_monitor import position_monitor
-                            position_monitor.refresh_positions()
-                        except Exception as e:
-                            pass  # Non-critical, continue monitoring
-                        refresh_counter = 0
+                    # Refresh positions to catch any missed subscriptions; the position
+                    # monitor rescans at most once per its refresh interval across all streams
+                    try:
+                        position_monitor.refresh_positions()
+                    except Exception as e:
+                        pass  # Non-critical, continue monitoring
                     # Get all active strategies with monitoring enabled
                     strategies = Strategy.query.filter_by(
                         user_id=user_id,
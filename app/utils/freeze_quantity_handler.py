@@ -5,10 +5,20 @@ Handles automatic split order placement when quantity exceeds freeze limits
 
 import logging
 from typing import Dict, Tuple
-from app.models import TradingSettings
 
 logger = logging.getLogger(__name__)
 
+# Default freeze quantities if not configured (as per NSE circular Dec 2025)
+DEFAULT_FREEZE_QUANTITIES = {
+    'NIFTY': 1800,
+    'BANKNIFTY': 600,
+    'SENSEX': 1000
+}
+DEFAULT_FREEZE_FALLBACK = 1800
+
+# (user_id, base_symbol) pairs already warned about falling back to defaults
+_default_warned = set()
+
 
 def get_freeze_quantity(user_id: int, symbol: str) -> int:
     """
@@ -29,6 +39,8 @@ def get_freeze_quantity(user_id: int, symbol: str) -> int:
             break
 
     # Get freeze quantity from trading settings
+    from app.models import TradingSettings
+
     setting = TradingSettings.query.filter_by(
         user_id=user_id,
         symbol=base_symbol,
@@ -39,15 +51,13 @@ def get_freeze_quantity(user_id: int, symbol: str) -> int:
         logger.debug(f"Freeze quantity for {base_symbol}: {setting.freeze_quantity}")
         return setting.freeze_quantity
 
-    # Default freeze quantities if not found (as per NSE circular Dec 2025)
-    defaults = {
-        'NIFTY': 1800,
-        'BANKNIFTY': 600,
-        'SENSEX': 1000
-    }
+    freeze_qty = DEFAULT_FREEZE_QUANTITIES.get(base_symbol, DEFAULT_FREEZE_FALLBACK)
 
-    freeze_qty = defaults.get(base_symbol, 1800)
-    logger.warning(f"Using default freeze quantity for {base_symbol}: {freeze_qty}")
+    # Warn once per user/symbol instead of on every order
+    warn_key = (user_id, base_symbol)
+    if warn_key not in _default_warned:
+        _default_warned.add(warn_key)
+        logger.warning("Using default freeze quantity for %s: %d", base_symbol, freeze_qty)
     return freeze_qty
 
 
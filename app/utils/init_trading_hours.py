@@ -2,18 +2,87 @@
 Initialize default trading hours templates and market holidays
 """
 
+import logging
 from datetime import time, date
-from app import db
-from app.models import TradingHoursTemplate, TradingSession, MarketHoliday
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Holiday(NamedTuple):
+    """Default market holiday row, converted to a dict only at the DB boundary"""
+    holiday_date: date
+    holiday_name: str
+    market: str = 'NSE'
+    holiday_type: str = 'trading'
+
+
+NSE_HOLIDAYS_2025 = (
+    Holiday(date(2025, 2, 26), 'Mahashivratri'),  # Sr. No 1
+    Holiday(date(2025, 3, 14), 'Holi'),  # Sr. No 2
+    Holiday(date(2025, 3, 31), 'Id-Ul-Fitr (Ramadan Eid)'),  # Sr. No 3
+    Holiday(date(2025, 4, 10), 'Shri Mahavir Jayanti'),  # Sr. No 4
+    Holiday(date(2025, 4, 14), 'Dr. Baba Saheb Ambedkar Jayanti'),  # Sr. No 5
+    Holiday(date(2025, 4, 18), 'Good Friday'),  # Sr. No 6
+    Holiday(date(2025, 5, 1), 'Maharashtra Day'),  # Sr. No 7
+    Holiday(date(2025, 8, 15), 'Independence Day / Parsi New Year'),  # Sr. No 8
+    Holiday(date(2025, 8, 27), 'Ganesh Chaturthi'),  # Sr. No 9
+    Holiday(date(2025, 10, 2), 'Mahatma Gandhi Jayanti / Dussehra'),  # Sr. No 10
+    Holiday(date(2025, 10, 21), 'Diwali - Laxmi Pujan'),  # Sr. No 11
+    Holiday(date(2025, 10, 22), 'Diwali - Balipratipada'),  # Sr. No 12
+    Holiday(date(2025, 11, 5), 'Prakash Gurpurb Sri Guru Nanak Dev'),  # Sr. No 13
+    Holiday(date(2025, 12, 25), 'Christmas'),  # Sr. No 14
+)
+
+NSE_HOLIDAYS_2026 = (
+    Holiday(date(2026, 1, 26), 'Republic Day'),  # Sr. No 1
+    Holiday(date(2026, 3, 3), 'Holi'),  # Sr. No 2
+    Holiday(date(2026, 3, 26), 'Shri Ram Navami'),  # Sr. No 3
+    Holiday(date(2026, 3, 31), 'Shri Mahavir Jayanti'),  # Sr. No 4
+    Holiday(date(2026, 4, 3), 'Good Friday'),  # Sr. No 5
+    Holiday(date(2026, 4, 14), 'Dr. Baba Saheb Ambedkar Jayanti'),  # Sr. No 6
+    Holiday(date(2026, 5, 1), 'Maharashtra Day'),  # Sr. No 7
+    Holiday(date(2026, 5, 28), 'Bakri Eid'),  # Sr. No 8
+    Holiday(date(2026, 6, 26), 'Moharram'),  # Sr. No 9
+    Holiday(date(2026, 9, 14), 'Ganesh Chaturthi'),  # Sr. No 10
+    Holiday(date(2026, 10, 2), 'Mahatma Gandhi Jayanti'),  # Sr. No 11
+    Holiday(date(2026, 10, 20), 'Dussehra'),  # Sr. No 12
+    Holiday(date(2026, 11, 10), 'Diwali - Balipratipada'),  # Sr. No 13
+    Holiday(date(2026, 11, 24), 'Prakash Gurpurb Sri Guru Nanak Dev'),  # Sr. No 14
+    Holiday(date(2026, 12, 25), 'Christmas'),  # Sr. No 15
+)
+
+
+def _add_missing_holidays(holidays):
+    """Bulk insert the given holidays that are not already in the database"""
+    from app import db
+    from app.models import MarketHoliday
+
+    # Holidays are per market, so another market's row on the same date doesn't count
+    existing = {
+        (row.holiday_date, row.market)
+        for row in db.session.query(MarketHoliday.holiday_date, MarketHoliday.market).filter(
+            MarketHoliday.holiday_date.in_({h.holiday_date for h in holidays}),
+            MarketHoliday.market.in_({h.market for h in holidays})
+        )
+    }
+    new_rows = [h._asdict() for h in holidays if (h.holiday_date, h.market) not in existing]
+
+    if new_rows:
+        db.session.bulk_insert_mappings(MarketHoliday, new_rows)
+    db.session.commit()
+    return len(new_rows)
 
 
 def create_default_nse_template():
     """Create default NSE trading hours template"""
-    
+    from app import db
+    from app.models import TradingHoursTemplate, TradingSession
+
     # Check if default template already exists
     existing = TradingHoursTemplate.query.filter_by(name='NSE Default').first()
     if existing:
-        print("Default NSE template already exists")
+        logger.info("Default NSE template already exists")
         return existing
     
     # Create NSE Default template
@@ -42,264 +111,65 @@ def create_default_nse_template():
         db.session.add(normal_session)
     
     db.session.commit()
-    print(f"Created default NSE template with ID: {template.id}")
+    logger.info("Created default NSE template with ID: %s", template.id)
     return template
 
 
 def create_default_holidays_2025():
     """Create default NSE holidays for 2025"""
-    
-    holidays_2025 = [
-        # Sr. No 1
-        {
-            'holiday_date': date(2025, 2, 26),
-            'holiday_name': 'Mahashivratri',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 2
-        {
-            'holiday_date': date(2025, 3, 14),
-            'holiday_name': 'Holi',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 3
-        {
-            'holiday_date': date(2025, 3, 31),
-            'holiday_name': 'Id-Ul-Fitr (Ramadan Eid)',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 4
-        {
-            'holiday_date': date(2025, 4, 10),
-            'holiday_name': 'Shri Mahavir Jayanti',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 5
-        {
-            'holiday_date': date(2025, 4, 14),
-            'holiday_name': 'Dr. Baba Saheb Ambedkar Jayanti',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 6
-        {
-            'holiday_date': date(2025, 4, 18),
-            'holiday_name': 'Good Friday',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 7
-        {
-            'holiday_date': date(2025, 5, 1),
-            'holiday_name': 'Maharashtra Day',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 8
-        {
-            'holiday_date': date(2025, 8, 15),
-            'holiday_name': 'Independence Day / Parsi New Year',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 9
-        {
-            'holiday_date': date(2025, 8, 27),
-            'holiday_name': 'Ganesh Chaturthi',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 10
-        {
-            'holiday_date': date(2025, 10, 2),
-            'holiday_name': 'Mahatma Gandhi Jayanti / Dussehra',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 11
-        {
-            'holiday_date': date(2025, 10, 21),
-            'holiday_name': 'Diwali - Laxmi Pujan',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 12
-        {
-            'holiday_date': date(2025, 10, 22),
-            'holiday_name': 'Diwali - Balipratipada',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 13
-        {
-            'holiday_date': date(2025, 11, 5),
-            'holiday_name': 'Prakash Gurpurb Sri Guru Nanak Dev',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 14
-        {
-            'holiday_date': date(2025, 12, 25),
-            'holiday_name': 'Christmas',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        }
-    ]
-    
-    added_count = 0
-    for holiday_data in holidays_2025:
-        # Check if holiday already exists
-        existing = MarketHoliday.query.filter_by(
-            holiday_date=holiday_data['holiday_date'],
-            market=holiday_data['market']
-        ).first()
-        
-        if not existing:
-            holiday = MarketHoliday(**holiday_data)
-            db.session.add(holiday)
-            added_count += 1
-    
-    db.session.commit()
-    print(f"Added {added_count} holidays for 2025")
+    added_count = _add_missing_holidays(NSE_HOLIDAYS_2025)
+    logger.info("Added %d holidays for %d", added_count, 2025)
     return added_count
 
 
 def create_default_holidays_2026():
     """Create default NSE holidays for 2026"""
+    added_count = _add_missing_holidays(NSE_HOLIDAYS_2026)
+    logger.info("Added %d holidays for %d", added_count, 2026)
+    return added_count
 
-    holidays_2026 = [
-        # Sr. No 1
-        {
-            'holiday_date': date(2026, 1, 26),
-            'holiday_name': 'Republic Day',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 2
-        {
-            'holiday_date': date(2026, 3, 3),
-            'holiday_name': 'Holi',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 3
-        {
-            'holiday_date': date(2026, 3, 26),
-            'holiday_name': 'Shri Ram Navami',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 4
-        {
-            'holiday_date': date(2026, 3, 31),
-            'holiday_name': 'Shri Mahavir Jayanti',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 5
-        {
-            'holiday_date': date(2026, 4, 3),
-            'holiday_name': 'Good Friday',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 6
-        {
-            'holiday_date': date(2026, 4, 14),
-            'holiday_name': 'Dr. Baba Saheb Ambedkar Jayanti',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 7
-        {
-            'holiday_date': date(2026, 5, 1),
-            'holiday_name': 'Maharashtra Day',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 8
-        {
-            'holiday_date': date(2026, 5, 28),
-            'holiday_name': 'Bakri Eid',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 9
-        {
-            'holiday_date': date(2026, 6, 26),
-            'holiday_name': 'Moharram',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 10
-        {
-            'holiday_date': date(2026, 9, 14),
-            'holiday_name': 'Ganesh Chaturthi',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 11
-        {
-            'holiday_date': date(2026, 10, 2),
-            'holiday_name': 'Mahatma Gandhi Jayanti',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 12
-        {
-            'holiday_date': date(2026, 10, 20),
-            'holiday_name': 'Dussehra',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 13
-        {
-            'holiday_date': date(2026, 11, 10),
-            'holiday_name': 'Diwali - Balipratipada',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 14
-        {
-            'holiday_date': date(2026, 11, 24),
-            'holiday_name': 'Prakash Gurpurb Sri Guru Nanak Dev',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        },
-        # Sr. No 15
-        {
-            'holiday_date': date(2026, 12, 25),
-            'holiday_name': 'Christmas',
-            'market': 'NSE',
-            'holiday_type': 'trading'
-        }
-    ]
 
-    added_count = 0
-    for holiday_data in holidays_2026:
-        # Check if holiday already exists
-        existing = MarketHoliday.query.filter_by(
-            holiday_date=holiday_data['holiday_date'],
-            market=holiday_data['market']
-        ).first()
+def _get_initialized_template():
+    """
+    Return the NSE Default template if all defaults are already present,
+    so warm starts cost two queries instead of one per default row
+    """
+    from app import db
+    from app.models import TradingHoursTemplate, MarketHoliday
 
-        if not existing:
-            holiday = MarketHoliday(**holiday_data)
-            db.session.add(holiday)
-            added_count += 1
+    template = TradingHoursTemplate.query.filter_by(name='NSE Default').first()
+    if not template:
+        return None
 
-    db.session.commit()
-    print(f"Added {added_count} holidays for 2026")
-    return added_count
+    # Only NSE rows count: another market's holiday on a default date doesn't
+    # stand in for the NSE one. A date added to NSE_HOLIDAYS_* is missing here
+    # until seeded, so editing the defaults re-runs the setup.
+    default_dates = {h.holiday_date for h in NSE_HOLIDAYS_2025 + NSE_HOLIDAYS_2026}
+    existing_count = db.session.query(
+        db.func.count(db.distinct(MarketHoliday.holiday_date))
+    ).filter(
+        MarketHoliday.market == 'NSE',
+        MarketHoliday.holiday_date.in_(default_dates)
+    ).scalar()
+    if existing_count < len(default_dates):
+        return None
+
+    return template
 
 
 def init_trading_hours_defaults():
     """Initialize all default trading hours data"""
+    from app import db
+
     try:
+        template = _get_initialized_template()
+        if template:
+            logger.info("Trading hours defaults already initialized")
+            return {
+                'template': template,
+                'holidays_added': 0
+            }
+
         # Create default template
         template = create_default_nse_template()
 
@@ -307,12 +177,12 @@ def init_trading_hours_defaults():
         holidays_added_2025 = create_default_holidays_2025()
         holidays_added_2026 = create_default_holidays_2026()
 
-        print("Trading hours defaults initialized successfully")
+        logger.info("Trading hours defaults initialized successfully")
         return {
             'template': template,
             'holidays_added': holidays_added_2025 + holidays_added_2026
         }
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error initializing trading hours defaults: {e}")
+        logger.exception("Error initializing trading hours defaults")
         raise
\ No newline at end of file
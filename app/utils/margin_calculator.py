@@ -3,18 +3,32 @@ Margin Calculator Module
 Handles lot size calculations based on available margin and trade quality
 """
 
+import copy
 import logging
+import threading
+import time
+from types import MappingProxyType
 from datetime import datetime, date
-from typing import Dict, Tuple, Optional
+from typing import Dict, Mapping, NamedTuple, Tuple, Optional
+import numpy as np
+from sqlalchemy import inspect
 from app.models import (
     MarginRequirement, TradeQuality, TradingSettings,
     MarginTracker, TradingAccount, MarketHoliday
 )
+from app import db
 from app.utils.openalgo_client import ExtendedOpenAlgoAPI
 
 logger = logging.getLogger(__name__)
 
 
+class ManualAccount(NamedTuple):
+    """Stand-in account for manual calculations where only the margin is known"""
+    available_margin: float
+    id: int = 0
+    account_name: str = "Manual Calculation"
+
+
 class MarginCalculator:
     """Calculate lot sizes based on margin requirements and trade quality"""
 
@@ -22,11 +36,98 @@ class MarginCalculator:
     # This is used as fallback if database value is not available
     DEFAULT_OPTION_BUYING_PREMIUM = 20000  # Rs 20,000 per lot
 
+    # Seconds a successful funds() response is shared between margin lookups
+    FUNDS_CACHE_TTL = 5
+
+    # Weekly expiry weekday per instrument (0=Monday)
+    EXPIRY_WEEKDAY = {
+        'NIFTY': 1,  # Tuesday
+        'BANKNIFTY': 1,  # Tuesday
+        'SENSEX': 3,  # Thursday
+    }
+    # Exchange whose holidays apply to each instrument (NSE if not listed)
+    EXPIRY_MARKET = {'SENSEX': 'BSE'}
+
+    # Map (trade_type, is_expiry) to MarginRequirement fields
+    MARGIN_FIELDS = {
+        ('sell_c_p', True): 'ce_pe_sell_expiry',
+        ('sell_c_p', False): 'ce_pe_sell_non_expiry',
+        ('sell_c_and_p', True): 'ce_and_pe_sell_expiry',
+        ('sell_c_and_p', False): 'ce_and_pe_sell_non_expiry',
+        ('futures', True): 'futures_expiry',
+        ('futures', False): 'futures_non_expiry',
+    }
+
+    # Loaded settings shared per user: user_id -> (created_at, MarginCalculator)
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_user(cls, user_id: int, ttl_seconds: int = 60) -> 'MarginCalculator':
+        """
+        Get a calculator for the user on settings loaded at most ttl_seconds ago.
+
+        Saves reloading margin requirements, trade qualities and trading settings
+        on every request. Settings endpoints call clear_cache() after saving.
+        Funds responses and API clients are not shared: each call gets its own,
+        so close() the calculator once done with it.
+        """
+        now = time.monotonic()
+        with cls._instances_lock:
+            cached = cls._instances.get(user_id)
+        if cached and now - cached[0] < ttl_seconds:
+            return cached[1]._for_caller()
+
+        calculator = cls(user_id)
+        calculator._detach_loaded_rows()
+        with cls._instances_lock:
+            cls._instances[user_id] = (now, calculator)
+        return calculator._for_caller()
+
+    @classmethod
+    def clear_cache(cls, user_id: Optional[int] = None):
+        """Drop the shared calculator for a user (or all users) after settings change"""
+        with cls._instances_lock:
+            if user_id is None:
+                cls._instances.clear()
+            else:
+                cls._instances.pop(user_id, None)
+
     def __init__(self, user_id: int):
         self.user_id = user_id
-        self.margin_requirements = self._load_margin_requirements()
-        self.trade_qualities = self._load_trade_qualities()
-        self.trading_settings = self._load_trading_settings()
+        self._load_all()
+        self._margin_table = self._build_margin_table()
+        self._quality_fraction = {
+            grade: float(quality.margin_percentage) / 100.0
+            for grade, quality in self.trade_qualities.items()
+        }
+        self._premium_by_instrument = {
+            instrument: self._compute_option_buying_premium(instrument)
+            for instrument in self.margin_requirements
+        }
+        self._reset_call_state()
+
+    def _reset_call_state(self):
+        """Start the lookups and API clients that belong to one caller"""
+        self._holiday_markets = {}  # date -> set of markets closed that day
+        self._expiry_cache = {}  # (date, instrument) -> bool
+        self._funds_cache = {}  # account_id -> (fetched_at, funds response)
+        self._api_clients = {}  # account_id -> ExtendedOpenAlgoAPI
+
+    def _for_caller(self) -> 'MarginCalculator':
+        """Copy sharing the loaded settings, with its own funds cache and API clients"""
+        calculator = copy.copy(self)
+        calculator._reset_call_state()
+        return calculator
+
+    def close(self):
+        """Close the API clients opened by this calculator"""
+        clients, self._api_clients = list(self._api_clients.values()), {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
 
     def get_option_buying_premium(self, instrument: str) -> float:
         """
@@ -38,6 +139,10 @@ class MarginCalculator:
         Returns:
             Premium per lot (float)
         """
+        return self._premium_by_instrument.get(instrument, self.DEFAULT_OPTION_BUYING_PREMIUM)
+
+    def _compute_option_buying_premium(self, instrument: str) -> float:
+        """Resolve premium per lot from the loaded margin requirements"""
         margin_req = self.margin_requirements.get(instrument)
         if margin_req:
             if instrument == 'SENSEX':
@@ -50,88 +155,135 @@ class MarginCalculator:
 
         return self.DEFAULT_OPTION_BUYING_PREMIUM
 
-    def _load_margin_requirements(self) -> Dict:
+    def _load_all(self):
+        """
+        Load margin requirements, trade qualities and trading settings together.
+        Each is exposed as a read-only mapping since calculators are shared
+        between requests (see for_user).
+        """
+        # Issue the three reads back to back on the same session/connection,
+        # without autoflush checks in between
+        with db.session.no_autoflush:
+            margins = MarginRequirement.query.filter_by(
+                user_id=self.user_id,
+                is_active=True
+            ).all()
+            trade_quals = TradeQuality.query.filter_by(
+                user_id=self.user_id,
+                is_active=True
+            ).all()
+            trade_settings = TradingSettings.query.filter_by(
+                user_id=self.user_id,
+                is_active=True
+            ).all()
+
+        self.margin_requirements = self._load_margin_requirements(margins)
+        self.trade_qualities = self._load_trade_qualities(trade_quals)
+        self.trading_settings = self._load_trading_settings(trade_settings)
+
+    def _load_margin_requirements(self, margins=None) -> Mapping:
         """Load user's margin requirements"""
         requirements = {}
-        margins = MarginRequirement.query.filter_by(
-            user_id=self.user_id,
-            is_active=True
-        ).all()
+        if margins is None:
+            margins = MarginRequirement.query.filter_by(
+                user_id=self.user_id,
+                is_active=True
+            ).all()
 
         for margin in margins:
             requirements[margin.instrument] = margin
 
         # Create defaults if not exists
         if not requirements:
-            MarginRequirement.get_or_create_defaults(self.user_id)
-            return self._load_margin_requirements()
+            requirements = MarginRequirement.get_or_create_defaults(self.user_id)
 
-        return requirements
+        return MappingProxyType(requirements)
 
-    def _load_trade_qualities(self) -> Dict:
+    def _detach_loaded_rows(self):
+        """
+        Detach loaded settings rows from the session so a shared calculator
+        keeps working after the request that built it commits or ends
+        """
+        for rows in (self.margin_requirements, self.trade_qualities, self.trading_settings):
+            for row in rows.values():
+                # Rows created by get_or_create_defaults were expired by its commit
+                if inspect(row).expired_attributes:
+                    db.session.refresh(row)
+                db.session.expunge(row)
+
+    def _build_margin_table(self) -> Dict:
+        """Flatten margin requirements into (instrument, trade_type, is_expiry) -> margin"""
+        table = {}
+        for instrument, margin_req in self.margin_requirements.items():
+            # SENSEX margins live in the sensex_* columns
+            prefix = 'sensex_' if instrument == 'SENSEX' else ''
+            for (trade_type, is_expiry), field in self.MARGIN_FIELDS.items():
+                table[(instrument, trade_type, is_expiry)] = getattr(margin_req, prefix + field)
+        return table
+
+    def _load_trade_qualities(self, trade_quals=None) -> Mapping:
         """Load user's trade quality settings"""
         qualities = {}
-        trade_quals = TradeQuality.query.filter_by(
-            user_id=self.user_id,
-            is_active=True
-        ).all()
+        if trade_quals is None:
+            trade_quals = TradeQuality.query.filter_by(
+                user_id=self.user_id,
+                is_active=True
+            ).all()
 
         for qual in trade_quals:
             qualities[qual.quality_grade] = qual
 
         # Create defaults if not exists
         if not qualities:
-            TradeQuality.get_or_create_defaults(self.user_id)
-            return self._load_trade_qualities()
+            qualities = TradeQuality.get_or_create_defaults(self.user_id)
 
-        return qualities
+        return MappingProxyType(qualities)
 
-    def _load_trading_settings(self) -> Dict:
+    def _load_trading_settings(self, trade_settings=None) -> Mapping:
         """Load user's trading settings (lot sizes)"""
         settings = {}
-        trade_settings = TradingSettings.query.filter_by(
-            user_id=self.user_id,
-            is_active=True
-        ).all()
+        if trade_settings is None:
+            trade_settings = TradingSettings.query.filter_by(
+                user_id=self.user_id,
+                is_active=True
+            ).all()
 
         for setting in trade_settings:
             settings[setting.symbol] = setting
 
         # Create defaults if not exists
         if not settings:
-            TradingSettings.get_or_create_defaults(self.user_id)
-            trade_settings = TradingSettings.query.filter_by(
-                user_id=self.user_id,
-                is_active=True
-            ).all()
-            for setting in trade_settings:
-                settings[setting.symbol] = setting
+            settings = TradingSettings.get_or_create_defaults(self.user_id)
+
+        return MappingProxyType(settings)
 
-        return settings
+    def _get_holiday_markets(self, day: date) -> set:
+        """Get markets with a holiday on the given date (one query per date)"""
+        markets = self._holiday_markets.get(day)
+        if markets is None:
+            holidays = MarketHoliday.query.filter_by(holiday_date=day).all()
+            markets = {holiday.market for holiday in holidays}
+            self._holiday_markets[day] = markets
+        return markets
 
     def is_expiry_day(self, instrument: str = 'NIFTY') -> bool:
         """Check if today is expiry day for the instrument"""
         today = date.today()
-        day_of_week = today.weekday()
-
-        # Check for special holidays
-        holiday = MarketHoliday.query.filter_by(
-            holiday_date=today,
-            market='NSE' if instrument != 'SENSEX' else 'BSE'
-        ).first()
-
-        if holiday:
+        key = (today, instrument)
+        cached = self._expiry_cache.get(key)
+        if cached is None:
+            cached = self._expiry_cache[key] = self._compute_expiry_day(today, instrument)
+        return cached
+
+    def _compute_expiry_day(self, today: date, instrument: str) -> bool:
+        """Uncached expiry check for the instrument on the given date"""
+        # Standard expiry days; only an expiry weekday needs the holiday check
+        if today.weekday() != self.EXPIRY_WEEKDAY.get(instrument):
             return False
 
-        # Standard expiry days
-        if instrument == 'NIFTY':
-            return day_of_week == 1  # Tuesday
-        elif instrument == 'BANKNIFTY':
-            return day_of_week == 1  # Tuesday
-        elif instrument == 'SENSEX':
-            return day_of_week == 3  # Thursday
-        else:
-            return False
+        # Check for special holidays
+        market = self.EXPIRY_MARKET.get(instrument, 'NSE')
+        return market not in self._get_holiday_markets(today)
 
     def get_margin_requirement(self,
                               instrument: str,
@@ -157,32 +309,9 @@ class MarginCalculator:
             logger.error(f"No margin requirements found for {instrument}")
             return 0
 
-        margin_req = self.margin_requirements[instrument]
-
-        # Map trade types to database fields
-        if instrument == 'SENSEX':
-            margin_map = {
-                ('sell_c_p', True): margin_req.sensex_ce_pe_sell_expiry,
-                ('sell_c_p', False): margin_req.sensex_ce_pe_sell_non_expiry,
-                ('sell_c_and_p', True): margin_req.sensex_ce_and_pe_sell_expiry,
-                ('sell_c_and_p', False): margin_req.sensex_ce_and_pe_sell_non_expiry,
-                ('futures', True): margin_req.sensex_futures_expiry,
-                ('futures', False): margin_req.sensex_futures_non_expiry,
-            }
-        else:
-            margin_map = {
-                ('sell_c_p', True): margin_req.ce_pe_sell_expiry,
-                ('sell_c_p', False): margin_req.ce_pe_sell_non_expiry,
-                ('sell_c_and_p', True): margin_req.ce_and_pe_sell_expiry,
-                ('sell_c_and_p', False): margin_req.ce_and_pe_sell_non_expiry,
-                ('futures', True): margin_req.futures_expiry,
-                ('futures', False): margin_req.futures_non_expiry,
-            }
-
-        key = (trade_type, is_expiry)
-        margin = margin_map.get(key, 0)
+        margin = self._margin_table.get((instrument, trade_type, is_expiry), 0)
 
-        logger.debug(f"Margin for {instrument} {trade_type} (expiry={is_expiry}): {margin}")
+        logger.debug("Margin for %s %s (expiry=%s): %s", instrument, trade_type, is_expiry, margin)
         return margin
 
     def calculate_lot_size(self,
@@ -207,8 +336,8 @@ class MarginCalculator:
         try:
             # Get available margin if not provided
             if available_margin is None:
-                # Check if it's a manual calculation (dummy account)
-                if hasattr(account, 'available_margin'):
+                # Check if it's a manual calculation
+                if isinstance(account, ManualAccount):
                     available_margin = account.available_margin
                 else:
                     available_margin = self.get_available_margin(account)
@@ -219,7 +348,7 @@ class MarginCalculator:
                 return 0, {"error": "Invalid quality grade"}
 
             quality = self.trade_qualities[quality_grade]
-            quality_percentage = quality.margin_percentage / 100
+            quality_percentage = self._quality_fraction[quality_grade]
 
             # Get margin requirement per lot
             margin_per_lot = self.get_margin_requirement(instrument, trade_type)
@@ -238,7 +367,7 @@ class MarginCalculator:
                     "margin_remaining": available_margin,
                     "calculation": "Option buying doesn't block any margin - lots not limited by margin"
                 }
-                logger.debug(f"Option buying for {account.account_name}: No margin blocked")
+                logger.debug("Option buying for %s: No margin blocked", account.account_name)
                 return 0, details
 
             if margin_per_lot < 0:
@@ -267,7 +396,7 @@ class MarginCalculator:
                 "calculation": f"{available_margin:.2f} × {quality.margin_percentage}% / {margin_per_lot:.2f} = {raw_lot_size:.3f} = {lot_size} lots"
             }
 
-            logger.debug(f"Lot calculation for {account.account_name}: {details['calculation']}")
+            logger.debug("Lot calculation for %s: %s", account.account_name, details['calculation'])
             return lot_size, details
 
         except Exception as e:
@@ -281,7 +410,8 @@ class MarginCalculator:
                                   margin_percentage: float,
                                   available_margin: Optional[float] = None,
                                   is_expiry: Optional[bool] = None,
-                                  margin_source: str = 'available') -> Tuple[int, Dict]:
+                                  margin_source: str = 'available',
+                                  include_calculation: bool = True) -> Tuple[int, Dict]:
         """
         Calculate optimal lot size with custom margin percentage (for risk profiles)
 
@@ -294,35 +424,39 @@ class MarginCalculator:
             is_expiry: Override expiry day detection (True=expiry, False=non-expiry, None=auto-detect)
             margin_source: 'available' for option sellers (uses margin requirements),
                           'cash' for option buyers (uses base margin of Rs 20,000/lot)
+            include_calculation: If False, leave the human-readable "calculation"
+                                 formula string out of the details (callers that
+                                 only need the numbers skip formatting it)
 
         Returns:
             Tuple of (lot_size, calculation_details)
         """
         try:
-            logger.debug(f"[LOT CALC DEBUG] Starting custom lot calculation for {account.account_name}")
-            logger.debug(f"[LOT CALC DEBUG] Instrument: {instrument}, Trade Type: {trade_type}, Margin %: {margin_percentage*100}%, Source: {margin_source}")
+            logger.debug("[LOT CALC DEBUG] Starting custom lot calculation for %s", account.account_name)
+            logger.debug("[LOT CALC DEBUG] Instrument: %s, Trade Type: %s, Margin %%: %s%%, Source: %s",
+                         instrument, trade_type, margin_percentage * 100, margin_source)
 
             # Get available margin if not provided
             if available_margin is None:
-                # Check if it's a manual calculation (dummy account)
-                if hasattr(account, 'available_margin'):
+                # Check if it's a manual calculation
+                if isinstance(account, ManualAccount):
                     available_margin = account.available_margin
-                    logger.debug(f"[LOT CALC DEBUG] Using account.available_margin: {available_margin:,.2f}")
+                    logger.debug("[LOT CALC DEBUG] Using account.available_margin: %.2f", available_margin)
                 else:
                     available_margin = self.get_available_margin(account)
-                    logger.debug(f"[LOT CALC DEBUG] Fetched available margin: {available_margin:,.2f}")
+                    logger.debug("[LOT CALC DEBUG] Fetched available margin: %.2f", available_margin)
             else:
-                logger.debug(f"[LOT CALC DEBUG] Using provided available margin: {available_margin:,.2f}")
+                logger.debug("[LOT CALC DEBUG] Using provided available margin: %.2f", available_margin)
 
             # Determine margin per lot based on margin_source
             if margin_source == 'cash':
                 # Option Buyer mode: Get premium per lot from database
                 margin_per_lot = self.get_option_buying_premium(instrument)
-                logger.debug(f"[LOT CALC DEBUG] Option Buyer mode: Using premium Rs {margin_per_lot:,}/lot from database")
+                logger.debug("[LOT CALC DEBUG] Option Buyer mode: Using premium Rs %s/lot from database", margin_per_lot)
             else:
                 # Option Seller mode: Get margin requirement from table
                 margin_per_lot = self.get_margin_requirement(instrument, trade_type, is_expiry=is_expiry)
-                logger.debug(f"[LOT CALC DEBUG] Option Seller mode: Margin per lot Rs {margin_per_lot:,.2f} (is_expiry={is_expiry})")
+                logger.debug("[LOT CALC DEBUG] Option Seller mode: Margin per lot Rs %.2f (is_expiry=%s)", margin_per_lot, is_expiry)
 
             # Special case: If margin requirement is 0 and NOT option buyer mode
             if margin_per_lot == 0 and margin_source != 'cash':
@@ -337,7 +471,7 @@ class MarginCalculator:
                     "margin_remaining": available_margin,
                     "calculation": "Option buying doesn't block any margin - lots not limited by margin"
                 }
-                logger.debug(f"[LOT CALC DEBUG] Option buying for {account.account_name}: No margin blocked")
+                logger.debug("[LOT CALC DEBUG] Option buying for %s: No margin blocked", account.account_name)
                 return 0, details
 
             if margin_per_lot < 0:
@@ -346,15 +480,16 @@ class MarginCalculator:
 
             # Calculate effective available margin using custom percentage
             effective_margin = available_margin * margin_percentage
-            logger.debug(f"[LOT CALC DEBUG] Effective margin (₹{available_margin:,.2f} × {margin_percentage*100}%): ₹{effective_margin:,.2f}")
+            logger.debug("[LOT CALC DEBUG] Effective margin (₹%.2f × %s%%): ₹%.2f",
+                         available_margin, margin_percentage * 100, effective_margin)
 
             # Calculate raw lot size
             raw_lot_size = effective_margin / margin_per_lot
-            logger.debug(f"[LOT CALC DEBUG] Raw lot size (₹{effective_margin:,.2f} / ₹{margin_per_lot:,.2f}): {raw_lot_size:.3f}")
+            logger.debug("[LOT CALC DEBUG] Raw lot size (₹%.2f / ₹%.2f): %.3f", effective_margin, margin_per_lot, raw_lot_size)
 
             # Round down to nearest integer
             lot_size = int(raw_lot_size)
-            logger.debug(f"[LOT CALC DEBUG] Final lot size (rounded down): {lot_size}")
+            logger.debug("[LOT CALC DEBUG] Final lot size (rounded down): %d", lot_size)
 
             # Prepare calculation details
             details = {
@@ -365,18 +500,53 @@ class MarginCalculator:
                 "raw_lot_size": raw_lot_size,
                 "final_lot_size": lot_size,
                 "margin_required": lot_size * margin_per_lot,
-                "margin_remaining": available_margin - (lot_size * margin_per_lot),
-                "calculation": f"{available_margin:.2f} × {margin_percentage*100}% / {margin_per_lot:.2f} = {raw_lot_size:.3f} = {lot_size} lots"
+                "margin_remaining": available_margin - (lot_size * margin_per_lot)
             }
-
-            logger.debug(f"[LOT CALC DEBUG] Margin required: ₹{details['margin_required']:,.2f}, Remaining: ₹{details['margin_remaining']:,.2f}")
-            logger.debug(f"Custom margin lot calculation for {account.account_name}: {details['calculation']}")
+            if include_calculation:
+                details["calculation"] = f"{available_margin:.2f} × {margin_percentage*100}% / {margin_per_lot:.2f} = {raw_lot_size:.3f} = {lot_size} lots"
+
+            logger.debug("[LOT CALC DEBUG] Margin required: ₹%.2f, Remaining: ₹%.2f",
+                         details['margin_required'], details['margin_remaining'])
+            logger.debug("Custom margin lot calculation for %s: %.2f × %s%% / %.2f = %.3f = %d lots",
+                         account.account_name, available_margin, margin_percentage * 100,
+                         margin_per_lot, raw_lot_size, lot_size)
             return lot_size, details
 
         except Exception as e:
             logger.error(f"[LOT CALC DEBUG] Error calculating lot size with custom margin: {e}", exc_info=True)
             return 0, {"error": str(e)}
 
+    def _get_client(self, account: TradingAccount) -> ExtendedOpenAlgoAPI:
+        """Get the API client for an account, created (and API key decrypted) once"""
+        client = self._api_clients.get(account.id)
+        if client is None:
+            client = ExtendedOpenAlgoAPI(
+                api_key=account.get_api_key(),
+                host=account.host_url
+            )
+            self._api_clients[account.id] = client
+        return client
+
+    def _fetch_funds(self, account: TradingAccount, force_refresh: bool = False) -> Dict:
+        """
+        Fetch the funds response for an account.
+
+        available and cash margin both come from the same funds() payload, so a
+        successful response is reused for FUNDS_CACHE_TTL seconds instead of
+        calling the broker twice for back-to-back lookups. force_refresh always
+        calls the broker (and caches the new response).
+        """
+        now = time.monotonic()
+        cached = self._funds_cache.get(account.id)
+        if not force_refresh and cached and now - cached[0] < self.FUNDS_CACHE_TTL:
+            return cached[1]
+
+        response = self._get_client(account).funds()
+
+        if response.get('status') == 'success':
+            self._funds_cache[account.id] = (now, response)
+        return response
+
     def get_available_margin(self, account: TradingAccount, force_refresh: bool = True) -> float:
         """
         Get available margin from account.
@@ -384,10 +554,12 @@ class MarginCalculator:
         Args:
             account: Trading account object
             force_refresh: If True, always fetch fresh data from API (default: True)
-                          If False, use cached data if available and < 5 minutes old
+                          If False, use cached data if available and < 5 minutes old,
+                          or a funds response from the last FUNDS_CACHE_TTL seconds
         """
         try:
-            logger.debug(f"[MARGIN DEBUG] Getting available margin for account: {account.account_name} (ID: {account.id}), force_refresh={force_refresh}")
+            logger.debug("[MARGIN DEBUG] Getting available margin for account: %s (ID: %s), force_refresh=%s",
+                         account.account_name, account.id, force_refresh)
 
             # Check if account has margin tracker
             tracker = MarginTracker.query.filter_by(account_id=account.id).first()
@@ -395,45 +567,40 @@ class MarginCalculator:
             # Only use cached data if force_refresh is False and cache is recent
             if not force_refresh and tracker and tracker.last_updated:
                 time_diff = (datetime.utcnow() - tracker.last_updated).seconds
-                logger.debug(f"[MARGIN DEBUG] Found tracker, last updated {time_diff} seconds ago")
+                logger.debug("[MARGIN DEBUG] Found tracker, last updated %d seconds ago", time_diff)
                 if time_diff < 300:  # 5 minutes
-                    logger.debug(f"[MARGIN DEBUG] Using cached margin: ₹{tracker.free_margin:,.2f}")
+                    logger.debug("[MARGIN DEBUG] Using cached margin: ₹%.2f", tracker.free_margin)
                     return tracker.free_margin
 
             # Fetch fresh margin data from API
-            logger.debug(f"[MARGIN DEBUG] Fetching fresh margin data from API: {account.host_url}")
-            client = ExtendedOpenAlgoAPI(
-                api_key=account.get_api_key(),
-                host=account.host_url
-            )
-
-            response = client.funds()
-            logger.debug(f"[MARGIN DEBUG] API Response status: {response.get('status')}")
+            logger.debug("[MARGIN DEBUG] Fetching fresh margin data from API: %s", account.host_url)
+            response = self._fetch_funds(account, force_refresh)
+            status = response.get('status')
+            logger.debug("[MARGIN DEBUG] API Response status: %s", status)
 
-            if response.get('status') == 'success':
+            if status == 'success':
                 funds_data = response.get('data', {})
-                logger.debug(f"[MARGIN DEBUG] Funds data received: {funds_data}")
+                logger.debug("[MARGIN DEBUG] Funds data received: %s", funds_data)
 
                 # Create or update margin tracker
                 if not tracker:
                     tracker = MarginTracker(account_id=account.id)
-                    from app import db
                     db.session.add(tracker)
-                    logger.debug(f"[MARGIN DEBUG] Created new MarginTracker for account {account.id}")
+                    logger.debug("[MARGIN DEBUG] Created new MarginTracker for account %s", account.id)
 
                 tracker.update_margins(funds_data)
-                from app import db
                 db.session.commit()
 
-                logger.debug(f"[MARGIN DEBUG] Updated tracker - Free margin: ₹{tracker.free_margin:,.2f}, Used margin: ₹{tracker.used_margin:,.2f}")
+                logger.debug("[MARGIN DEBUG] Updated tracker - Free margin: ₹%.2f, Used margin: ₹%.2f",
+                             tracker.free_margin, tracker.used_margin)
                 return tracker.free_margin
 
             else:
-                logger.warning(f"[MARGIN DEBUG] API call failed, status: {response.get('status')}, message: {response.get('message')}")
+                logger.warning("[MARGIN DEBUG] API call failed, status: %s, message: %s", status, response.get('message'))
                 # Fallback to cached data if available
                 if account.last_funds_data:
                     fallback_margin = account.last_funds_data.get('totalcash', 0)
-                    logger.debug(f"[MARGIN DEBUG] Using fallback margin from last_funds_data: ₹{fallback_margin:,.2f}")
+                    logger.debug("[MARGIN DEBUG] Using fallback margin from last_funds_data: ₹%.2f", fallback_margin)
                     return fallback_margin
                 logger.warning(f"[MARGIN DEBUG] No fallback data available, returning 0")
                 return 0
@@ -451,34 +618,29 @@ class MarginCalculator:
 
         Args:
             account: Trading account object
-            force_refresh: If True, always fetch fresh data from API
+            force_refresh: If True, always fetch fresh data from API (default: True)
+                          If False, reuse a funds response from the last FUNDS_CACHE_TTL seconds
 
         Returns:
             Cash margin amount (availablecash from API)
         """
         try:
-            logger.debug(f"[CASH MARGIN] Getting cash margin for account: {account.account_name}")
-
-            # Fetch fresh funds data from API
-            client = ExtendedOpenAlgoAPI(
-                api_key=account.get_api_key(),
-                host=account.host_url
-            )
+            logger.debug("[CASH MARGIN] Getting cash margin for account: %s", account.account_name)
 
-            response = client.funds()
+            response = self._fetch_funds(account, force_refresh)
 
             if response.get('status') == 'success':
                 funds_data = response.get('data', {})
                 # Get availablecash - this is pure cash without collateral
                 cash_margin = float(funds_data.get('availablecash', 0))
-                logger.debug(f"[CASH MARGIN] Cash margin for {account.account_name}: {cash_margin:,.2f}")
+                logger.debug("[CASH MARGIN] Cash margin for %s: %.2f", account.account_name, cash_margin)
                 return cash_margin
             else:
                 logger.warning(f"[CASH MARGIN] API call failed, using cached data")
                 # Fallback to cached data
                 if account.last_funds_data:
                     cash_margin = float(account.last_funds_data.get('availablecash', 0))
-                    logger.debug(f"[CASH MARGIN] Using cached cash margin: {cash_margin:,.2f}")
+                    logger.debug("[CASH MARGIN] Using cached cash margin: %.2f", cash_margin)
                     return cash_margin
                 return 0
 
@@ -509,7 +671,7 @@ class MarginCalculator:
             Tuple of (number_of_lots, calculation_details)
         """
         try:
-            logger.debug(f"[OPTION BUY] Calculating lots for {instrument} option buying")
+            logger.debug("[OPTION BUY] Calculating lots for %s option buying", instrument)
 
             # Get quality settings
             quality = self.trade_qualities.get(quality_grade)
@@ -521,13 +683,13 @@ class MarginCalculator:
             if margin_source != 'cash':
                 logger.warning(f"[OPTION BUY] Grade {quality_grade} uses {margin_source} margin, not cash")
 
-            # Get cash margin
-            cash_margin = self.get_cash_margin(account)
+            # Get cash margin, reusing a funds response just fetched for this account
+            cash_margin = self.get_cash_margin(account, force_refresh=False)
             if cash_margin <= 0:
                 return 0, {"error": "No cash margin available"}
 
             # Calculate premium budget
-            margin_percentage = quality.margin_percentage / 100
+            margin_percentage = self._quality_fraction[quality_grade]
             premium_budget = cash_margin * margin_percentage
 
             # Calculate premium per lot
@@ -555,7 +717,7 @@ class MarginCalculator:
                 "calculation": f"Cash {cash_margin:,.2f} x {quality.margin_percentage}% = {premium_budget:,.2f} budget / {premium_per_lot:,.2f} per lot = {final_lots} lots"
             }
 
-            logger.debug(f"[OPTION BUY] {account.account_name}: {details['calculation']}")
+            logger.debug("[OPTION BUY] %s: %s", account.account_name, details['calculation'])
             return final_lots, details
 
         except Exception as e:
@@ -578,7 +740,8 @@ class MarginCalculator:
             Dictionary with lot sizes and details for each trade
         """
         results = {}
-        remaining_margin = self.get_available_margin(account)
+        initial_margin = self.get_available_margin(account)
+        remaining_margin = initial_margin
 
         for i, trade in enumerate(trades):
             instrument = trade.get('instrument')
@@ -608,9 +771,9 @@ class MarginCalculator:
 
         results['summary'] = {
             "total_trades": len(trades),
-            "initial_margin": self.get_available_margin(account),
+            "initial_margin": initial_margin,
             "final_margin": remaining_margin,
-            "total_margin_used": self.get_available_margin(account) - remaining_margin
+            "total_margin_used": initial_margin - remaining_margin
         }
 
         return results
@@ -632,74 +795,87 @@ class MarginCalculator:
         """
         validation_results = {}
 
+        # Option types sold per instrument, to detect CE+PE spreads in one pass
+        sold_option_types = self._build_sold_option_types(strategy_legs)
+
+        # Trade type, lots and margin per lot do not depend on the account
+        leg_specs = []
+        for leg in strategy_legs:
+            # Determine trade type from leg
+            if leg.product_type == 'options':
+                if leg.action == 'SELL':
+                    # Check if it's a spread (both CE and PE)
+                    trade_type = 'sell_c_and_p' if self._is_spread_leg(leg, sold_option_types) else 'sell_c_p'
+                else:
+                    trade_type = 'buy'
+            elif leg.product_type == 'futures':
+                trade_type = 'futures'
+            else:
+                trade_type = 'buy'
+
+            # Calculate required margin for this leg
+            margin_per_lot = self.get_margin_requirement(leg.instrument, trade_type)
+
+            # Get lot size from leg or calculate
+            lots = leg.lots if leg.lots else 1
+            leg_specs.append((leg.instrument, trade_type, lots, margin_per_lot))
+
+        # Margin required per leg and running total, computed once as vectors
+        leg_count = len(leg_specs)
+        margins = np.fromiter((spec[3] for spec in leg_specs), dtype=np.float64, count=leg_count)
+        lots_array = np.fromiter((spec[2] for spec in leg_specs), dtype=np.float64, count=leg_count)
+        margin_required = margins * lots_array
+        cumulative_required = np.cumsum(margin_required)
+        total_margin_required = float(cumulative_required[-1]) if leg_count else 0
+
         for account in accounts:
+            available_margin = self.get_available_margin(account)
+
+            # A leg can execute if every leg up to and including it fits in the margin
+            can_execute = cumulative_required <= available_margin
+            remaining_before = available_margin - (cumulative_required - margin_required)
+
             account_result = {
                 "account_name": account.account_name,
-                "available_margin": self.get_available_margin(account),
+                "available_margin": available_margin,
                 "legs": [],
-                "total_margin_required": 0,
-                "is_feasible": True,
+                "total_margin_required": total_margin_required,
+                "is_feasible": bool(can_execute.all()),
                 "recommended_lots": {}
             }
 
-            remaining_margin = account_result["available_margin"]
-
-            for leg in strategy_legs:
-                # Determine trade type from leg
-                if leg.product_type == 'options':
-                    if leg.action == 'SELL':
-                        # Check if it's a spread (both CE and PE)
-                        trade_type = 'sell_c_and_p' if self._is_spread_leg(leg, strategy_legs) else 'sell_c_p'
-                    else:
-                        trade_type = 'buy'
-                elif leg.product_type == 'futures':
-                    trade_type = 'futures'
-                else:
-                    trade_type = 'buy'
-
-                # Calculate required margin for this leg
-                margin_per_lot = self.get_margin_requirement(leg.instrument, trade_type)
-
-                # Get lot size from leg or calculate
-                lots = leg.lots if leg.lots else 1
-                margin_required = margin_per_lot * lots
-
-                leg_result = {
-                    "instrument": leg.instrument,
+            for i, (instrument, trade_type, lots, margin_per_lot) in enumerate(leg_specs):
+                leg_can_execute = bool(can_execute[i])
+                account_result["legs"].append({
+                    "instrument": instrument,
                     "trade_type": trade_type,
                     "lots": lots,
                     "margin_per_lot": margin_per_lot,
-                    "margin_required": margin_required,
-                    "can_execute": remaining_margin >= margin_required
-                }
-
-                account_result["legs"].append(leg_result)
-                account_result["total_margin_required"] += margin_required
+                    "margin_required": float(margin_required[i]),
+                    "can_execute": leg_can_execute
+                })
 
-                if not leg_result["can_execute"]:
-                    account_result["is_feasible"] = False
+                if not leg_can_execute:
                     # Calculate maximum possible lots
-                    max_lots = int(remaining_margin / margin_per_lot) if margin_per_lot > 0 else 0
-                    account_result["recommended_lots"][leg.instrument] = max_lots
-
-                remaining_margin -= margin_required
+                    max_lots = int(remaining_before[i] / margin_per_lot) if margin_per_lot > 0 else 0
+                    account_result["recommended_lots"][instrument] = max_lots
 
             validation_results[account.id] = account_result
 
         return validation_results
 
-    def _is_spread_leg(self, current_leg, all_legs) -> bool:
+    def _build_sold_option_types(self, legs) -> Dict:
+        """Map instrument -> set of option types with SELL option legs"""
+        sold_option_types = {}
+        for leg in legs:
+            if leg.product_type == 'options' and leg.action == 'SELL':
+                sold_option_types.setdefault(leg.instrument, set()).add(leg.option_type)
+        return sold_option_types
+
+    def _is_spread_leg(self, current_leg, sold_option_types) -> bool:
         """Check if current leg is part of a spread (both CE and PE)"""
-        for other_leg in all_legs:
-            if (other_leg.instrument == current_leg.instrument and
-                other_leg.product_type == 'options' and
-                other_leg.action == 'SELL' and
-                other_leg != current_leg):
-                # Check if one is CE and other is PE
-                if ((current_leg.option_type == 'CE' and other_leg.option_type == 'PE') or
-                    (current_leg.option_type == 'PE' and other_leg.option_type == 'CE')):
-                    return True
-        return False
+        opposite = {'CE': 'PE', 'PE': 'CE'}.get(current_leg.option_type)
+        return opposite is not None and opposite in sold_option_types.get(current_leg.instrument, ())
 
     def update_margin_allocation(self,
                                 account: TradingAccount,
@@ -722,7 +898,6 @@ class MarginCalculator:
                 tracker = MarginTracker(account_id=account.id)
                 # Initialize with current margin
                 tracker.free_margin = self.get_available_margin(account)
-                from app import db
                 db.session.add(tracker)
 
             if action == 'allocate':
@@ -730,7 +905,6 @@ class MarginCalculator:
             elif action == 'release':
                 tracker.release_margin(trade_id)
 
-            from app import db
             db.session.commit()
             return True
 
@@ -1,6 +1,7 @@
 """
 Extended OpenAlgo API client with additional methods
 """
+import httpx
 from openalgo import api
 
 
@@ -15,6 +16,58 @@ class ExtendedOpenAlgoAPI(api):
         super().__init__(api_key, host, version, ws_port, ws_url)
         # Override the default 120s timeout with a much shorter one
         self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        """
+        Pooled HTTP client, created on first request and kept for the life of
+        this object so repeated calls reuse the connection (keep-alive)
+        """
+        if self._session is None:
+            self._session = httpx.Client(timeout=self.timeout)
+        return self._session
+
+    def close(self):
+        """Close the pooled HTTP connection"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _make_request(self, endpoint, payload):
+        """
+        Make HTTP request with proper error handling
+        Same as the SDK's, which opens a new connection per call via
+        httpx.post, but sent over self.session
+        """
+        url = self.base_url + endpoint
+        try:
+            response = self.session.post(url, json=payload, headers=self.headers)
+            return self._handle_response(response)
+        except httpx.TimeoutException:
+            return {
+                'status': 'error',
+                'message': 'Request timed out. The server took too long to respond.',
+                'error_type': 'timeout_error'
+            }
+        except httpx.ConnectError:
+            return {
+                'status': 'error',
+                'message': 'Failed to connect to the server. Please check if the server is running.',
+                'error_type': 'connection_error'
+            }
+        except httpx.HTTPError as e:
+            return {
+                'status': 'error',
+                'message': f'HTTP error occurred: {str(e)}',
+                'error_type': 'http_error'
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': f'An unexpected error occurred: {str(e)}',
+                'error_type': 'unknown_error'
+            }
 
     def ping(self):
         """
@@ -36,4 +89,22 @@ class ExtendedOpenAlgoAPI(api):
             }
         """
         payload = {"apikey": self.api_key}
-        return self._make_request("ping", payload)
\ No newline at end of file
+        return self._make_request("ping", payload)
+
+    def multiquotes(self, *, symbols):
+        """
+        Get real-time quotes for several symbols in one request
+
+        Args:
+            symbols: list of dicts with 'symbol' and 'exchange' keys
+
+        Returns:
+            dict: Response with status and a 'results' list, one entry per
+            symbol with 'symbol', 'exchange' and quote 'data' (ltp, bid, ask,
+            volume, oi, ...)
+        """
+        payload = {
+            "apikey": self.api_key,
+            "symbols": symbols
+        }
+        return self._make_request("multiquotes", payload)
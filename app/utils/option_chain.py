@@ -4,34 +4,127 @@ Real-time option chain management for NIFTY and BANKNIFTY with market depth
 """
 
 import json
+import sys
 import threading
 import time
 from datetime import datetime, timedelta
 from collections import deque
+from functools import partial
 from typing import Dict, List, Optional, Any
 import logging
-from cachetools import TTLCache
+import msgspec
+import numpy as np
 import pytz
+from numba import njit
 
 from openalgo import api
 
 logger = logging.getLogger(__name__)
 
+IST = pytz.timezone('Asia/Kolkata')
+
 
 class OptionChainCache:
-    """Zero-config cache for option chain data"""
+    """
+    Zero-config cache for option chain data
+    Entries are (expires_at, value) tuples in a plain dict: single-key dict
+    reads and writes are atomic under the GIL, so the tick path takes no lock.
+    """
     
     def __init__(self, maxsize=100, ttl=30):
-        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
-        self.lock = threading.Lock()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache = {}
+        self.lock = threading.Lock()  # Only taken when sweeping
     
     def get(self, key):
-        with self.lock:
-            return self.cache.get(key)
+        entry = self.cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
     
     def set(self, key, value):
+        now = time.monotonic()
+        self.cache[key] = (now + self.ttl, value)
+        if len(self.cache) > self.maxsize:
+            self._sweep(now)
+    
+    def _sweep(self, now):
+        """Evict expired entries, then the oldest ones while still over maxsize"""
         with self.lock:
-            self.cache[key] = value
+            for key, entry in list(self.cache.items()):
+                if entry[0] <= now:
+                    self.cache.pop(key, None)
+            if len(self.cache) > self.maxsize:
+                oldest = sorted(self.cache.items(), key=lambda item: item[1][0])
+                for key, _ in oldest[:len(self.cache) - self.maxsize]:
+                    self.cache.pop(key, None)
+
+
+# Numeric depth fields kept per strike and side in OptionChainManager._depth
+DEPTH_FIELDS = ('ltp', 'bid', 'ask', 'bid_qty', 'ask_qty', 'spread', 'volume', 'oi')
+SIDE_INDEX = {'CE': 0, 'PE': 1}
+BID = DEPTH_FIELDS.index('bid')
+ASK = DEPTH_FIELDS.index('ask')
+SPREAD = DEPTH_FIELDS.index('spread')
+VOLUME = DEPTH_FIELDS.index('volume')
+OI = DEPTH_FIELDS.index('oi')
+
+
+@njit(cache=True)
+def _metric_totals(depth):
+    """CE/PE volume and OI totals over the (strikes x side x field) depth array in a single pass"""
+    ce_volume = ce_oi = pe_volume = pe_oi = 0.0
+    for i in range(depth.shape[0]):
+        ce_volume += depth[i, 0, VOLUME]
+        ce_oi += depth[i, 0, OI]
+        pe_volume += depth[i, 1, VOLUME]
+        pe_oi += depth[i, 1, OI]
+    return ce_volume, ce_oi, pe_volume, pe_oi
+
+
+def _depth_row(values):
+    """ce_data/pe_data dict for one side's row of the depth array"""
+    ltp, bid, ask, bid_qty, ask_qty, spread, volume, oi = values.tolist()
+    return {
+        'ltp': ltp, 'bid': bid, 'ask': ask,
+        'bid_qty': int(bid_qty), 'ask_qty': int(ask_qty),
+        'spread': spread, 'volume': int(volume), 'oi': int(oi)
+    }
+
+
+# Field aliases used by different depth feed formats, in lookup order
+VOLUME_FIELDS = ('volume', 'Volume')
+OI_FIELDS = ('oi', 'openInterest', 'OI', 'open_interest')
+BID_LEVEL_FIELDS = ('buy', 'bids')
+ASK_LEVEL_FIELDS = ('sell', 'asks')
+
+
+def _first_field(data, names, default=0):
+    """Value of the first of names present in data, without evaluating the other lookups"""
+    for name in names:
+        if name in data:
+            return data[name]
+    return default
+
+
+def _top_of_book(levels):
+    """Return (price, quantity) of the best depth level, or (0, 0) if empty"""
+    if not levels:
+        return 0, 0
+    level = levels[0]
+    if isinstance(level, dict):
+        price = level['price'] if 'price' in level else level.get('Price', 0)
+        if 'quantity' in level:
+            quantity = level['quantity']
+        elif 'Quantity' in level:
+            quantity = level['Quantity']
+        else:
+            quantity = level.get('qty', 0)
+        return price, quantity
+    if isinstance(level, (list, tuple)) and len(level) >= 2:
+        return level[0], level[1]  # [price, quantity]
+    return 0, 0
 
 
 class OptionChainManager:
@@ -40,6 +133,11 @@ class OptionChainManager:
     Handles both LTP and bid/ask data for order management
     Note: Not a singleton anymore to support multiple underlying/expiry combinations
     """
+
+    # Cache lifetimes (seconds) by how fast the data moves
+    DEPTH_CACHE_TTL = 2       # Per-strike depth rows
+    METRICS_CACHE_TTL = 5     # PCR / volume / OI totals
+    CHAIN_CACHE_TTL = 0.2     # Encoded chain for streaming endpoints
     
     def __init__(self, underlying, expiry, websocket_manager=None):
         self.underlying = underlying
@@ -47,29 +145,87 @@ class OptionChainManager:
         self.strike_step = 50 if underlying == 'NIFTY' else 100
         self.option_data = {}
         self.subscription_map = {}
+        # CE/PE depth values (DEPTH_FIELDS) per strike, contiguous:
+        # _depth[_strike_index[strike], SIDE_INDEX[option_type]]
+        self._strike_index = {}
+        self._tag_index = {}  # 'ATM'/'ITM1'/'OTM1'... -> strike
+        self._depth = np.zeros((0, 2, len(DEPTH_FIELDS)))
+        # option symbol -> (strike, option_type, depth row view, cache key),
+        # so a tick resolves everything it writes with one lookup
+        self._depth_slots = {}
         self.underlying_ltp = 0
         self.underlying_bid = 0
         self.underlying_ask = 0
         self.atm_strike = 0
         self.websocket_manager = websocket_manager
-        self.cache = OptionChainCache()
+        self.cache = OptionChainCache(maxsize=200, ttl=self.DEPTH_CACHE_TTL)
+        # Metrics and encoded chain are keyed by _update_count, so a depth
+        # update invalidates them immediately; the TTL bounds other staleness
+        self._metrics_cache = OptionChainCache(maxsize=10, ttl=self.METRICS_CACHE_TTL)
+        self._chain_cache = OptionChainCache(maxsize=2, ttl=self.CHAIN_CACHE_TTL)
         self.monitoring_active = False
         self.initialized = False
         self.manager_id = f"{underlying}_{expiry}"
+        # BASE + EXPIRY + 25: the "25" is the year 2025, hardcoded for now
+        self._symbol_prefix = f"{underlying}{self._format_expiry()}25"
+        self._update_count = 0  # Bumped on every depth update
+        # (update_count, tuple of strike views) shared by readers until the next update
+        self._options_snapshot = (None, ())
     
     def initialize(self, api_client):
         """Setup option chain with depth subscriptions"""
         if self.initialized:
-            logger.debug(f"Option chain already initialized for {self.underlying}")
+            logger.debug("Option chain already initialized for %s", self.underlying)
             return True
             
         self.api_client = api_client
         self.calculate_atm()
         self.generate_strikes()
+        self.prefetch_option_quotes()
         self.setup_depth_subscriptions()
         self.initialized = True
         return True
     
+    def prefetch_option_quotes(self):
+        """
+        Warm option_data from one batch quote request so the chain isn't all
+        zeros until the first depth frame for each strike arrives
+        """
+        subscriptions = self._option_subscriptions()
+        if not subscriptions:
+            return
+        
+        try:
+            response = self.api_client.multiquotes(
+                symbols=[{'symbol': sub['symbol'], 'exchange': sub['exchange']} for sub in subscriptions]
+            )
+        except Exception as e:
+            logger.warning("Batch quote prefetch failed for %s: %s", self.underlying, e)
+            return
+        
+        if response.get('status') != 'success':
+            logger.debug("Batch quote prefetch unavailable for %s: %s", self.underlying, response.get('message', 'Unknown error'))
+            return
+        
+        warmed = 0
+        for result in response.get('results', []):
+            slot = self._depth_slots.get(result.get('symbol'))
+            quote = result.get('data') or {}
+            if slot is None or not quote:
+                continue
+            self._write_depth(
+                slot,
+                ltp=float(quote.get('ltp') or 0),
+                bid=float(quote.get('bid') or 0),
+                ask=float(quote.get('ask') or 0),
+                bid_qty=0,
+                ask_qty=0,
+                volume=int(quote.get('volume') or 0),
+                oi=int(quote.get('oi') or 0)
+            )
+            warmed += 1
+        logger.debug("Prefetched quotes for %d %s options", warmed, self.underlying)
+    
     def calculate_atm(self):
         """Determine ATM strike from underlying LTP"""
         try:
@@ -77,7 +233,7 @@ class OptionChainManager:
             if self.underlying_ltp and self.underlying_ltp > 0:
                 # Calculate ATM strike from existing LTP
                 self.atm_strike = round(self.underlying_ltp / self.strike_step) * self.strike_step
-                logger.debug(f"{self.underlying} LTP: {self.underlying_ltp}, ATM: {self.atm_strike} (from cached)")
+                logger.debug("%s LTP: %s, ATM: %s (from cached)", self.underlying, self.underlying_ltp, self.atm_strike)
                 return self.atm_strike
             
             # Otherwise fetch underlying quote from API
@@ -93,16 +249,16 @@ class OptionChainManager:
                 # Calculate ATM strike
                 if self.underlying_ltp > 0:
                     self.atm_strike = round(self.underlying_ltp / self.strike_step) * self.strike_step
-                    logger.debug(f"{self.underlying} LTP: {self.underlying_ltp}, ATM: {self.atm_strike} (from API)")
+                    logger.debug("%s LTP: %s, ATM: %s (from API)", self.underlying, self.underlying_ltp, self.atm_strike)
                     return self.atm_strike
                 else:
-                    logger.warning(f"Invalid LTP received for {self.underlying}: {self.underlying_ltp}")
+                    logger.warning("Invalid LTP received for %s: %s", self.underlying, self.underlying_ltp)
                     return 0
             else:
-                logger.warning(f"Failed to fetch quote for {self.underlying}: {response.get('message', 'Unknown error')}")
+                logger.warning("Failed to fetch quote for %s: %s", self.underlying, response.get('message', 'Unknown error'))
                 return 0
         except Exception as e:
-            logger.error(f"Error calculating ATM: {e}")
+            logger.error("Error calculating ATM: %s", e)
             return 0
     
     def generate_strikes(self):
@@ -144,16 +300,10 @@ class OptionChainManager:
                 'strike': strike,
                 'tag': strike_info['tag'],
                 'position': strike_info['position'],
-                'ce_symbol': self.construct_option_symbol(strike, 'CE'),
-                'pe_symbol': self.construct_option_symbol(strike, 'PE'),
-                'ce_data': {
-                    'ltp': 0, 'bid': 0, 'ask': 0, 'bid_qty': 0,
-                    'ask_qty': 0, 'spread': 0, 'volume': 0, 'oi': 0
-                },
-                'pe_data': {
-                    'ltp': 0, 'bid': 0, 'ask': 0, 'bid_qty': 0,
-                    'ask_qty': 0, 'spread': 0, 'volume': 0, 'oi': 0
-                }
+                # Interned so symbol lookups from ticks hit on identity
+                'ce_symbol': sys.intern(self.construct_option_symbol(strike, 'CE')),
+                'pe_symbol': sys.intern(self.construct_option_symbol(strike, 'PE'))
+                # ce_data/pe_data live in self._depth (see _strike_view)
             }
             
             # Map symbols to strikes for quick lookup
@@ -163,15 +313,58 @@ class OptionChainManager:
             self.subscription_map[self.option_data[strike]['pe_symbol']] = {
                 'strike': strike, 'type': 'PE'
             }
+            self._tag_index[strike_info['tag']] = strike
         
-        logger.debug(f"Generated {len(strikes)} strikes for {self.underlying}")
+        self._build_depth_array()
+
+        logger.debug("Generated %d strikes for %s", len(strikes), self.underlying)
+
+    def _build_depth_array(self):
+        """Allocate the depth array, one row per strike, keeping values of strikes that already existed"""
+        old_depth, old_index = self._depth, self._strike_index
+        strikes = sorted(self.option_data)
+        self._strike_index = {strike: i for i, strike in enumerate(strikes)}
+        self._depth = np.zeros((len(strikes), 2, len(DEPTH_FIELDS)))
+        for strike, i in self._strike_index.items():
+            old_i = old_index.get(strike)
+            if old_i is not None:
+                self._depth[i] = old_depth[old_i]
+
+        self._update_count += 1  # Invalidate metrics computed from the old array
+        old_slots, self._depth_slots = self._depth_slots, {}
+        for strike, i in self._strike_index.items():
+            strike_data = self.option_data[strike]
+            for option_type, side in SIDE_INDEX.items():
+                self._depth_slots[strike_data[f'{option_type.lower()}_symbol']] = (
+                    strike, option_type, self._depth[i, side],
+                    f"{self.underlying}_{strike}_{option_type}"
+                )
+
+        self._route_depth_updates(old_slots)
+
+    def _route_depth_updates(self, old_slots):
+        """
+        Have the WebSocket manager hand each option symbol's ticks straight to
+        _apply_depth with its slot already bound, so no per-tick lookup is needed
+        """
+        if not self.websocket_manager:
+            return
+
+        for symbol in old_slots.keys() - self._depth_slots.keys():
+            self.websocket_manager.unregister_symbol_handler(symbol)
+        for symbol, slot in self._depth_slots.items():
+            self.websocket_manager.register_symbol_handler(symbol, partial(self._apply_depth, slot))
+
+    def _strike_view(self, strike_data):
+        """Strike entry with its ce_data/pe_data dicts filled in from the depth array"""
+        depth = self._depth[self._strike_index[strike_data['strike']]]
+        view = dict(strike_data)
+        view['ce_data'] = _depth_row(depth[0])
+        view['pe_data'] = _depth_row(depth[1])
+        return view
     
-    def construct_option_symbol(self, strike, option_type):
-        """Construct OpenAlgo option symbol"""
-        # Format: [Base Symbol][Expiration Date][Strike Price][Option Type]
-        # Date format: DDMMMYY (e.g., 28AUG25 for August 28, 2025)
-        # Example: NIFTY28AUG2524800CE
-        
+    def _format_expiry(self):
+        """Format the expiry as DDMMM for option symbols (e.g., 28AUG)"""
         # Parse expiry date to proper format
         expiry_formatted = None
         
@@ -201,7 +394,7 @@ class OptionChainManager:
                     else:
                         expiry_formatted = '28AUG'  # Default
             except Exception as e:
-                logger.error(f"Error parsing expiry: {e}")
+                logger.error("Error parsing expiry: %s", e)
                 expiry_formatted = '28AUG'
         elif isinstance(self.expiry, datetime):
             # Format datetime as DDMMM (no year in symbol)
@@ -210,18 +403,18 @@ class OptionChainManager:
             # Default handling
             expiry_formatted = '28AUG'
         
-        # Remove decimal if whole number
-        if strike == int(strike):
-            strike_str = str(int(strike))
-        else:
-            strike_str = str(strike)
-        
-        # Construct symbol: BASE + EXPIRY + 25 + STRIKE + CE/PE
-        # The "25" is the year 2025, hardcoded for now
-        # Format: NIFTY28AUG2524800CE
-        symbol = f"{self.underlying}{expiry_formatted}25{strike_str}{option_type}"
+        return expiry_formatted
+    
+    def construct_option_symbol(self, strike, option_type):
+        """Construct OpenAlgo option symbol"""
+        # Format: [Base Symbol][Expiration Date][Strike Price][Option Type]
+        # Date format: DDMMMYY (e.g., 28AUG25 for August 28, 2025)
+        # Example: NIFTY28AUG2524800CE
+        # The underlying + expiry prefix is fixed per manager (see __init__);
+        # strikes are whole multiples of strike_step (50/100)
+        symbol = f"{self._symbol_prefix}{int(strike)}{option_type}"
         
-        logger.debug(f"Generated symbol: {symbol} from expiry={self.expiry}, strike={strike}, type={option_type}")
+        logger.debug("Generated symbol: %s from expiry=%s, strike=%s, type=%s", symbol, self.expiry, strike, option_type)
         
         return symbol
     
@@ -236,39 +429,50 @@ class OptionChainManager:
             return
         
         # IMPORTANT: Register handlers BEFORE subscribing
-        logger.debug(f"[REGISTER] Registering handlers for {self.underlying} option chain")
-        self.websocket_manager.register_handler('depth', self.handle_depth_update)
+        # Option depth is routed per symbol from _build_depth_array
+        logger.debug("[REGISTER] Registering handlers for %s option chain", self.underlying)
         self.websocket_manager.register_handler('quote', self.handle_quote_update)
-        logger.debug(f"[REGISTER] Handlers registered successfully")
+        logger.debug("[REGISTER] Handlers registered successfully")
         
         # Ensure WebSocket is authenticated before subscribing
         if not self.websocket_manager.authenticated:
-            logger.warning(f"WebSocket not authenticated, skipping subscriptions for {self.underlying}")
+            logger.warning("WebSocket not authenticated, skipping subscriptions for %s", self.underlying)
             return
         
         # Small delay to ensure WebSocket is ready
         time.sleep(0.5)
         
-        # Subscribe to underlying in quote mode
-        self.subscribe_underlying_quote()
-        
-        # Batch subscribe to all options in depth mode for efficiency
-        self.batch_subscribe_options()
+        # Underlying in quote mode and all options in depth mode, in one bulk request
+        self.websocket_manager.subscribe_bulk(
+            [self._underlying_subscription()] + self._option_subscriptions()
+        )
         
-        logger.debug(f"Setup depth subscriptions for {self.underlying} option chain")
+        logger.debug("Setup depth subscriptions for %s option chain", self.underlying)
     
+    def _underlying_subscription(self):
+        """Quote-mode subscription for the underlying index"""
+        # Determine exchange based on underlying
+        exchange = 'BSE_INDEX' if self.underlying == 'SENSEX' else 'NSE_INDEX'
+        return {
+            'exchange': exchange,
+            'symbol': self.underlying,
+            'mode': 'quote'
+        }
+
+    def _option_subscriptions(self):
+        """Depth-mode subscriptions for every CE and PE strike"""
+        # Determine exchange based on underlying
+        exchange = 'BFO' if self.underlying == 'SENSEX' else 'NFO'
+        return [
+            {'symbol': symbol, 'exchange': exchange, 'mode': 'depth'}
+            for strike_data in self.option_data.values()
+            for symbol in (strike_data['ce_symbol'], strike_data['pe_symbol'])
+        ]
+
     def subscribe_underlying_quote(self):
         """Subscribe to underlying index in quote mode"""
         if self.websocket_manager:
-            # Determine exchange based on underlying
-            exchange = 'BSE_INDEX' if self.underlying == 'SENSEX' else 'NSE_INDEX'
-            
-            subscription = {
-                'exchange': exchange,
-                'symbol': self.underlying,
-                'mode': 'quote'
-            }
-            self.websocket_manager.subscribe(subscription)
+            self.websocket_manager.subscribe(self._underlying_subscription())
     
     def subscribe_option_depth(self, symbol):
         """Subscribe to option symbol in depth mode"""
@@ -284,38 +488,13 @@ class OptionChainManager:
             self.websocket_manager.subscribe(subscription)
     
     def batch_subscribe_options(self):
-        """Batch subscribe to all option strikes for both quote and depth"""
+        """Subscribe to all option strikes in depth mode (includes LTP, volume, bid/ask)"""
         if not self.websocket_manager:
             return
-        
-        # Determine exchange based on underlying
-        exchange = 'BFO' if self.underlying == 'SENSEX' else 'NFO'
-        
-        # Build instruments list for batch subscription
-        instruments = []
-        for strike_data in self.option_data.values():
-            # Add CE strike
-            instruments.append({
-                'symbol': strike_data['ce_symbol'],
-                'exchange': exchange
-            })
-            # Add PE strike
-            instruments.append({
-                'symbol': strike_data['pe_symbol'],
-                'exchange': exchange
-            })
-        
-        # Subscribe in batches of 20 to avoid overwhelming the server
-        batch_size = 20
-        for i in range(0, len(instruments), batch_size):
-            batch = instruments[i:i + batch_size]
-            logger.debug(f"Subscribing to batch of {len(batch)} option instruments in depth mode")
-            
-            # Subscribe to depth mode (includes quote data)
-            # Depth mode provides: LTP, Volume, Bid/Ask with quantities
-            self.websocket_manager.subscribe_batch(batch, mode='depth')
-            
-            # No delay to prevent blocking Flask startup
+
+        subscriptions = self._option_subscriptions()
+        logger.debug("Subscribing to %d option instruments in depth mode", len(subscriptions))
+        self.websocket_manager.subscribe_bulk(subscriptions)
     
     def handle_quote_update(self, data):
         """
@@ -334,11 +513,11 @@ class OptionChainManager:
                 self.atm_strike = self.calculate_atm()
                 
                 if old_atm != self.atm_strike:
-                    logger.debug(f"[ATM_UPDATE] ATM strike changed from {old_atm} to {self.atm_strike} (spot: {self.underlying_ltp})")
+                    logger.debug("[ATM_UPDATE] ATM strike changed from %s to %s (spot: %s)", old_atm, self.atm_strike, self.underlying_ltp)
                     
                     # If strikes haven't been generated yet (option_data is empty), generate them now
                     if not self.option_data:
-                        logger.debug(f"[STRIKE_GEN] Generating strikes for {self.underlying} with ATM {self.atm_strike}")
+                        logger.debug("[STRIKE_GEN] Generating strikes for %s with ATM %s", self.underlying, self.atm_strike)
                         self.generate_strikes()
                         # Also setup subscriptions if not done yet
                         if self.websocket_manager and self.websocket_manager.authenticated:
@@ -347,7 +526,7 @@ class OptionChainManager:
                         # Update tags if strikes already exist
                         self.update_option_tags()
                 
-                logger.debug(f"[QUOTE_UPDATE] {self.underlying} spot updated to {self.underlying_ltp}")
+                logger.debug("[QUOTE_UPDATE] %s spot updated to %s", self.underlying, self.underlying_ltp)
                 
                 # Also extract bid/ask if available
                 self.underlying_bid = float(data.get('bid', 0) or 0)
@@ -358,103 +537,99 @@ class OptionChainManager:
         Process incoming depth data for options
         Extract top-level bid/ask for order management
         """
-        # Enhanced debugging
-        logger.debug(f"[DEPTH_UPDATE] Called with data type: {type(data)}")
-        logger.debug(f"[DEPTH_UPDATE] Data keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
+        depth_slots = self._depth_slots
         
         # Try multiple symbol fields
-        symbol = data.get('symbol') or data.get('Symbol') or data.get('trading_symbol') or data.get('tradingSymbol') or ''
+        symbol = sys.intern(data.get('symbol') or data.get('Symbol') or data.get('trading_symbol') or data.get('tradingSymbol') or '')
         
-        logger.debug(f"[DEPTH_UPDATE] Extracted symbol: '{symbol}'")
-        logger.debug(f"[DEPTH_UPDATE] Subscription map has {len(self.subscription_map)} symbols")
-        if len(self.subscription_map) > 0:
-            logger.debug(f"[DEPTH_UPDATE] Sample symbols in map: {list(self.subscription_map.keys())[:3]}")
+        # Enhanced debugging - only build the arguments when DEBUG is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("[DEPTH_UPDATE] Called with data type: %s", type(data))
+            logger.debug("[DEPTH_UPDATE] Data keys: %s", list(data.keys()) if isinstance(data, dict) else 'Not a dict')
+            logger.debug("[DEPTH_UPDATE] Extracted symbol: '%s'", symbol)
+            logger.debug("[DEPTH_UPDATE] Subscription map has %d symbols", len(depth_slots))
+            if len(depth_slots) > 0:
+                logger.debug("[DEPTH_UPDATE] Sample symbols in map: %s", list(depth_slots.keys())[:3])
+            # Log raw data structure for debugging
+            logger.debug("[OPTION_CHAIN_RAW] LTP=%s, bids count=%d, asks count=%d",
+                         data.get('ltp'), len(data.get('bids', [])), len(data.get('asks', [])))
         
-        # Log raw data structure for debugging
-        logger.debug(f"[OPTION_CHAIN_RAW] LTP={data.get('ltp')}, bids count={len(data.get('bids', []))}, asks count={len(data.get('asks', []))}")
+        slot = depth_slots.get(symbol)
+        if slot is not None:
+            self._apply_depth(slot, data)
+
+    def _apply_depth(self, slot, data):
+        """
+        Parse one depth tick for an already-resolved slot and write it
+        Registered per symbol with the WebSocket manager (see _route_depth_updates)
+        """
+        strike, option_type = slot[0], slot[1]  # option_type is 'CE' or 'PE'
         
-        if symbol in self.subscription_map:
-            strike_info = self.subscription_map[symbol]
-            option_type = strike_info['type']  # 'CE' or 'PE'
-            strike = strike_info['strike']
-            
-            logger.debug(f"[OPTION_CHAIN] Updating {self.underlying} {strike} {option_type} with depth data")
-            
-            # Update with depth data - handle various formats
-            # Check for nested depth structure first
-            depth_data_raw = data.get('depth', {})
-            if depth_data_raw:
-                bids = depth_data_raw.get('buy', depth_data_raw.get('bids', []))
-                asks = depth_data_raw.get('sell', depth_data_raw.get('asks', []))
-            else:
-                bids = data.get('bids', [])
-                asks = data.get('asks', [])
-            
-            logger.debug(f"[DEPTH_EXTRACT] depth field: {depth_data_raw}, bids: {bids[:1] if bids else 'empty'}, asks: {asks[:1] if asks else 'empty'}")
-            
-            # Extract LTP - try multiple possible fields
-            ltp = data.get('ltp') or data.get('last_price') or data.get('lastPrice') or 0
-            
-            # Handle bid/ask format variations
-            best_bid = 0
-            best_ask = 0
-            bid_qty = 0
-            ask_qty = 0
-            
-            if bids and len(bids) > 0:
-                if isinstance(bids[0], dict):
-                    best_bid = bids[0].get('price', bids[0].get('Price', 0))
-                    bid_qty = bids[0].get('quantity', bids[0].get('Quantity', bids[0].get('qty', 0)))
-                elif isinstance(bids[0], (list, tuple)) and len(bids[0]) >= 2:
-                    best_bid = bids[0][0]  # Price at index 0
-                    bid_qty = bids[0][1]   # Quantity at index 1
-            
-            if asks and len(asks) > 0:
-                if isinstance(asks[0], dict):
-                    best_ask = asks[0].get('price', asks[0].get('Price', 0))
-                    ask_qty = asks[0].get('quantity', asks[0].get('Quantity', asks[0].get('qty', 0)))
-                elif isinstance(asks[0], (list, tuple)) and len(asks[0]) >= 2:
-                    best_ask = asks[0][0]  # Price at index 0
-                    ask_qty = asks[0][1]   # Quantity at index 1
-            
-            # If no bid/ask data but we have LTP, use LTP as approximation
-            if not best_bid and not best_ask and ltp:
-                # Use a small spread around LTP as fallback
-                best_bid = float(ltp) * 0.995  # 0.5% below LTP
-                best_ask = float(ltp) * 1.005  # 0.5% above LTP
-                bid_qty = 100  # Default quantity
-                ask_qty = 100
-                logger.debug(f"[FALLBACK] No bid/ask, using LTP-based approximation: bid={best_bid:.2f}, ask={best_ask:.2f}")
-            
-            depth_data = {
-                'ltp': float(ltp) if ltp else 0,
-                'bid': float(best_bid) if best_bid else 0,
-                'ask': float(best_ask) if best_ask else 0,
-                'bid_qty': int(bid_qty) if bid_qty else 0,
-                'ask_qty': int(ask_qty) if ask_qty else 0,
-                'spread': 0,
-                'volume': int(data.get('volume', data.get('Volume', 0)) or 0),
-                'oi': int(data.get('oi', data.get('openInterest', data.get('OI', data.get('open_interest', 0)))) or 0)
-            }
-            
-            # Calculate spread
-            if depth_data['bid'] > 0 and depth_data['ask'] > 0:
-                depth_data['spread'] = depth_data['ask'] - depth_data['bid']
-            
-            # Update option chain data
-            self.update_option_depth(strike, option_type, depth_data)
+        logger.debug("[OPTION_CHAIN] Updating %s %s %s with depth data", self.underlying, strike, option_type)
+        
+        # Update with depth data - handle various formats
+        # Check for nested depth structure first
+        depth_data_raw = data.get('depth', {})
+        if depth_data_raw:
+            bids = _first_field(depth_data_raw, BID_LEVEL_FIELDS, [])
+            asks = _first_field(depth_data_raw, ASK_LEVEL_FIELDS, [])
+        else:
+            bids = data.get('bids', [])
+            asks = data.get('asks', [])
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[DEPTH_EXTRACT] depth field: %s, bids: %s, asks: %s",
+                         depth_data_raw, bids[:1] if bids else 'empty', asks[:1] if asks else 'empty')
+        
+        # Extract LTP - try multiple possible fields
+        ltp = data.get('ltp') or data.get('last_price') or data.get('lastPrice') or 0
+        
+        # Top of book - handle bid/ask format variations
+        best_bid, bid_qty = _top_of_book(bids)
+        best_ask, ask_qty = _top_of_book(asks)
+        
+        # If no bid/ask data but we have LTP, use LTP as approximation
+        if not best_bid and not best_ask and ltp:
+            # Use a small spread around LTP as fallback
+            best_bid = float(ltp) * 0.995  # 0.5% below LTP
+            best_ask = float(ltp) * 1.005  # 0.5% above LTP
+            bid_qty = 100  # Default quantity
+            ask_qty = 100
+            logger.debug("[FALLBACK] No bid/ask, using LTP-based approximation: bid=%.2f, ask=%.2f", best_bid, best_ask)
+        
+        # Update option chain data in place
+        self._write_depth(
+            slot,
+            ltp=float(ltp) if ltp else 0,
+            bid=float(best_bid) if best_bid else 0,
+            ask=float(best_ask) if best_ask else 0,
+            bid_qty=int(bid_qty) if bid_qty else 0,
+            ask_qty=int(ask_qty) if ask_qty else 0,
+            volume=int(_first_field(data, VOLUME_FIELDS) or 0),
+            oi=int(_first_field(data, OI_FIELDS) or 0)
+        )
     
-    def update_option_depth(self, strike, option_type, depth_data):
-        """Update option chain with depth data"""
-        if strike in self.option_data:
-            if option_type == 'CE':
-                self.option_data[strike]['ce_data'] = depth_data
-            else:
-                self.option_data[strike]['pe_data'] = depth_data
-            
-            # Update cache
-            cache_key = f"{self.underlying}_{strike}_{option_type}"
-            self.cache.set(cache_key, depth_data)
+    def update_option_depth(self, strike, option_type, ltp, bid, ask, bid_qty, ask_qty, volume, oi):
+        """Update option chain with depth data, writing into the strike's depth array row"""
+        strike_data = self.option_data.get(strike)
+        if strike_data is None:
+            return
+
+        symbol = strike_data['ce_symbol' if option_type == 'CE' else 'pe_symbol']
+        self._write_depth(self._depth_slots[symbol], ltp, bid, ask, bid_qty, ask_qty, volume, oi)
+
+    def _write_depth(self, slot, ltp, bid, ask, bid_qty, ask_qty, volume, oi):
+        """Write one depth tick into a precomputed slot (see _build_depth_array)"""
+        _, _, row, cache_key = slot
+
+        spread = ask - bid if bid > 0 and ask > 0 else 0
+        values = (ltp, bid, ask, bid_qty, ask_qty, spread, volume, oi)  # DEPTH_FIELDS order
+        row[:] = values
+
+        # Update cache
+        self.cache.set(cache_key, values)
+        self._update_count += 1
     
     def get_option_chain(self):
         """Return formatted option chain data"""
@@ -465,18 +640,44 @@ class OptionChainManager:
             'underlying_ask': self.underlying_ask,
             'atm_strike': self.atm_strike,
             'expiry': self.expiry,
-            'timestamp': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat(),
-            'options': list(self.option_data.values()),
+            'timestamp': datetime.now(IST).isoformat(),
+            'options': self._get_options_snapshot(),
             'market_metrics': self.calculate_market_metrics()
         }
     
+    def _get_options_snapshot(self):
+        """
+        Copy-on-write view of all strikes: rebuilt only after an update, and
+        made of fresh dicts so readers never see a half-applied tick
+        """
+        update_count, options = self._options_snapshot
+        if update_count != self._update_count:
+            update_count = self._update_count
+            options = tuple(self._strike_view(strike_data) for strike_data in self.option_data.values())
+            self._options_snapshot = (update_count, options)
+        return options
+    
+    def get_option_chain_json(self):
+        """
+        Return get_option_chain() encoded as JSON bytes for streaming endpoints
+        Reused for up to CHAIN_CACHE_TTL while no depth update has arrived
+        """
+        update_count = self._update_count
+        encoded = self._chain_cache.get(update_count)
+        if encoded is None:
+            encoded = msgspec.json.encode(self.get_option_chain())
+            self._chain_cache.set(update_count, encoded)
+        return encoded
+    
     def update_option_tags(self):
         """Update option tags when ATM changes"""
+        tag_index = {}
         for strike_data in self.option_data.values():
             strike = strike_data['strike']
             position = self.get_strike_position(strike)
             strike_data['position'] = position
             strike_data['tag'] = self.get_position_tag(position)
+            tag_index.setdefault(strike_data['tag'], strike)
             
             # Update PE tag (reversed)
             if position == 0:
@@ -485,13 +686,21 @@ class OptionChainManager:
                 strike_data['pe_tag'] = f'OTM{abs(position)}'
             else:
                 strike_data['pe_tag'] = f'ITM{abs(position)}'
+
+        self._tag_index = tag_index
+        self._update_count += 1  # Tags changed; invalidate snapshots
     
     def calculate_market_metrics(self):
         """Calculate PCR and other metrics"""
-        total_ce_volume = sum(opt['ce_data'].get('volume', 0) for opt in self.option_data.values())
-        total_pe_volume = sum(opt['pe_data'].get('volume', 0) for opt in self.option_data.values())
-        total_ce_oi = sum(opt['ce_data'].get('oi', 0) for opt in self.option_data.values())
-        total_pe_oi = sum(opt['pe_data'].get('oi', 0) for opt in self.option_data.values())
+        cache_key = (self._update_count, self.atm_strike)
+        metrics = self._metrics_cache.get(cache_key)
+        if metrics is not None:
+            return metrics
+        
+        # One fused, compiled reduction over all four columns
+        total_ce_volume, total_ce_oi, total_pe_volume, total_pe_oi = (
+            int(total) for total in _metric_totals(self._depth)
+        )
         
         # Calculate PCR based on OI
         pcr = total_pe_oi / total_ce_oi if total_ce_oi > 0 else 0
@@ -499,7 +708,7 @@ class OptionChainManager:
         # Calculate volume-based PCR as well
         pcr_volume = total_pe_volume / total_ce_volume if total_ce_volume > 0 else 0
         
-        return {
+        metrics = {
             'total_ce_volume': total_ce_volume,
             'total_pe_volume': total_pe_volume,
             'total_volume': total_ce_volume + total_pe_volume,
@@ -509,12 +718,34 @@ class OptionChainManager:
             'pcr_volume': round(pcr_volume, 2),
             'max_pain': self.calculate_max_pain()
         }
+        self._metrics_cache.set(cache_key, metrics)
+        return metrics
     
     def calculate_max_pain(self):
-        """Calculate max pain strike"""
-        # Simplified max pain calculation
-        # In production, use proper max pain algorithm
-        return self.atm_strike
+        """
+        Calculate max pain strike: the expiry price, among listed strikes, at
+        which the total payout to CE and PE holders (weighted by OI) is smallest
+        Falls back to the ATM strike until any OI has been received
+        """
+        cache_key = ('max_pain', self._update_count)
+        max_pain = self._metrics_cache.get(cache_key)
+        if max_pain is not None:
+            return max_pain
+        
+        ce_oi = self._depth[:, 0, OI]
+        pe_oi = self._depth[:, 1, OI]
+        if not ce_oi.any() and not pe_oi.any():
+            return self.atm_strike
+        
+        # Depth rows are in ascending strike order (see _build_depth_array);
+        # diff[k, i] = candidate expiry strike k - option strike i
+        strikes = np.fromiter(self._strike_index, dtype=float, count=len(self._strike_index))
+        diff = strikes[:, None] - strikes[None, :]
+        pain = np.maximum(diff, 0) @ ce_oi + np.maximum(-diff, 0) @ pe_oi
+        max_pain = int(strikes[pain.argmin()])
+        
+        self._metrics_cache.set(cache_key, max_pain)
+        return max_pain
 
     def get_strike_position(self, strike):
         """Get strike position relative to ATM"""
@@ -541,15 +772,12 @@ class OptionChainManager:
             strike = strike_info['strike']
             option_type = strike_info['type']
             
-            if option_type == 'CE':
-                depth_data = self.option_data[strike]['ce_data']
-            else:
-                depth_data = self.option_data[strike]['pe_data']
+            depth = self._depth[self._strike_index[strike], SIDE_INDEX[option_type]]
             
             if action == 'BUY':
-                return depth_data['ask']
+                return float(depth[ASK])
             else:  # SELL
-                return depth_data['bid']
+                return float(depth[BID])
         return 0
     
     def get_option_spread(self, symbol):
@@ -559,28 +787,25 @@ class OptionChainManager:
             strike = strike_info['strike']
             option_type = strike_info['type']
             
-            if option_type == 'CE':
-                return self.option_data[strike]['ce_data']['spread']
-            else:
-                return self.option_data[strike]['pe_data']['spread']
+            return float(self._depth[self._strike_index[strike], SIDE_INDEX[option_type], SPREAD])
         return 0
     
     def get_option_by_tag(self, tag):
         """Get option data by tag (ATM, ITM1, OTM1, etc.)"""
-        for strike_data in self.option_data.values():
-            if strike_data['tag'] == tag:
-                return strike_data
-        return None
+        strike = self._tag_index.get(tag)
+        if strike is None:
+            return None
+        return self._strike_view(self.option_data[strike])
     
     def start_monitoring(self):
         """Start background monitoring"""
         self.monitoring_active = True
-        logger.debug(f"Started monitoring option chain for {self.underlying}")
+        logger.debug("Started monitoring option chain for %s", self.underlying)
     
     def stop_monitoring(self):
         """Stop background monitoring"""
         self.monitoring_active = False
-        logger.debug(f"Stopped monitoring option chain for {self.underlying}")
+        logger.debug("Stopped monitoring option chain for %s", self.underlying)
     
     def is_active(self):
         """Check if option chain monitoring is active"""
@@ -1,17 +1,28 @@
 """
 Background Order Status Polling Service
-Checks pending orders every 2 seconds and updates database without blocking order placement
+Checks pending orders on an exponential backoff schedule (fast while an order is
+fresh, slower as it stays open) and updates database without blocking order placement
 
 Uses standard threading for background tasks.
 """
 
+import heapq
 import logging
+import queue
 import threading
-from datetime import datetime, timedelta
-from typing import Dict
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+from typing import Dict, List, Set, Tuple
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
 
 # Cross-platform compatibility
-from app.utils.compat import sleep, create_lock
+from app.utils.compat import create_lock
 
 from app import db
 from app.models import StrategyExecution
@@ -26,38 +37,90 @@ def get_position_monitor():
     return position_monitor
 
 
+def account_key_for(account_id: int, account_name: str) -> str:
+    """Key for per-account state (rate limit, batches, status cache)"""
+    return f"{account_id}_{account_name}"
+
+
+@dataclass(slots=True)
+class PendingOrder:
+    """An order in the polling queue (times are time.monotonic() seconds)"""
+    account_id: int
+    account_name: str
+    api_key: str
+    host_url: str
+    order_id: str
+    strategy_name: str
+    added_time: float
+    next_check_time: float
+    check_count: int = 0
+    price_refetches: int = 0  # Re-checks spent waiting for average_price
+    book_missed: bool = False  # Absent from a fetched orderbook: checked with orderstatus from then on
+    account_key: str = field(init=False)  # Rate limits and batches are per account
+
+    def __post_init__(self):
+        self.account_key = account_key_for(self.account_id, self.account_name)
+
+
 class OrderStatusPoller:
     """
     Background service to poll order status without blocking order placement.
     Respects 1 req/sec/account rate limit.
-    """
 
-    _instance = None
-    _lock = threading.Lock()
+    Locking: _lock guards pending_orders together with the schedule heap, held
+    orders and in-flight accounts, which must change as one. It is only held
+    for those in-memory updates (a batch's changes are applied in one block),
+    never across API calls, DB work or key decryption. The status and client
+    caches have their own _cache_lock for writes, so the per-call cache updates
+    from every account worker don't queue behind the poll loop. last_check_time
+    is written and the caches are read without a lock (single-key dict
+    operations are atomic).
+    """
 
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+    # Per-order check schedule (seconds): first check POLL_BACKOFF_BASE after the
+    # order is added, then doubling while it stays open, capped at POLL_BACKOFF_MAX
+    # (default for ORDER_POLL_MAX_INTERVAL)
+    POLL_BACKOFF_BASE = 0.5
+    POLL_BACKOFF_MAX = 10
+    POLL_IDLE_INTERVAL = 2  # Queue empty
+    POLL_MIN_INTERVAL = 0.1  # Floor between cycles
+    STATUS_CACHE_TTL = 0.5  # orderstatus responses shared by executions with the same order_id
+    PRICE_REFETCH_ATTEMPTS = 3  # Re-checks (after 1s, 2s, 3s) when a complete order has no average_price yet
+    RATE_LIMIT_NS = 1_000_000_000  # 1 req/sec/account, in time.monotonic_ns() units
+    ACCOUNT_WORKERS = 16  # Accounts checked at once; further due accounts wait for a free worker
 
     def __init__(self):
-        if self._initialized:
-            return
-
-        self.pending_orders: Dict[int, Dict] = {}  # execution_id: {account, order_id, strategy_name, ...}
+        self._lock = threading.Lock()  # Guards the polling queue (see class docstring)
+        self.pending_orders: Dict[int, PendingOrder] = {}  # execution_id: PendingOrder
+        # Min-heap of (next_check_time, execution_id); entries whose time no longer matches
+        # the order's next_check_time (or whose order is gone) are skipped when popped
+        self._schedule: List[Tuple[float, int]] = []
+        self._held: Dict[str, Set[int]] = {}  # account_key: orders that fell due while the account was in flight
         self.is_running = False
         self.poller_thread = None
-        self.last_check_time: Dict[str, datetime] = {}  # account_key: last_check_time
+        self._executor = None  # Account check workers, kept for the life of the poller
+        self._notify_queue = queue.Queue()  # (event, execution_id, order_id) for PositionMonitor, None to stop
+        self._notify_thread = None
+        self.last_check_time: Dict[str, int] = {}  # account_key: time.monotonic_ns() of last API call
+        self._reserved_slots: Dict[str, int] = {}  # account_key: monotonic_ns of the first call slot not yet given to a deferred order
         self.flask_app = None  # Store Flask app reference instead of creating new one
-        self._initialized = True
+        # Polling policy, overridden from app config in set_flask_app
+        self.max_age_seconds = 28800  # 8 hours - allows full trading day for LIMIT orders
+        self.max_checks = 0  # Checks before an open order is dropped (0 = no limit)
+        self.poll_max_interval = self.POLL_BACKOFF_MAX
+        self._wake = threading.Event()  # Set when orders are added, an account check finishes or the poller stops
+        self._accounts_in_flight = set()  # account_keys with a check running
+        self._clients: Dict[Tuple[str, str], ExtendedOpenAlgoAPI] = {}  # (api_key, host_url): client
+        self._status_cache: Dict[Tuple[str, str], Tuple[float, Dict]] = {}  # (account_key, order_id): (fetched_at, response)
+        self._cache_lock = threading.Lock()  # Guards _clients and _status_cache writes, apart from the queue's _lock
         logger.debug("Order Status Poller initialized")
 
     def set_flask_app(self, app):
         """Store Flask app instance for use in background thread"""
         self.flask_app = app
+        self.max_age_seconds = app.config.get('ORDER_POLL_MAX_AGE', self.max_age_seconds)
+        self.max_checks = app.config.get('ORDER_POLL_MAX_CHECKS', self.max_checks)
+        self.poll_max_interval = app.config.get('ORDER_POLL_MAX_INTERVAL', self.poll_max_interval)
         logger.debug("Flask app instance registered with Order Status Poller")
 
     def start(self):
@@ -71,46 +134,81 @@ class OrderStatusPoller:
     def stop(self):
         """Stop the background polling service"""
         self.is_running = False
+        self._wake.set()
         if self.poller_thread:
             try:
                 self.poller_thread.join(timeout=5)
             except Exception:
                 pass
+        if self._notify_thread:
+            # Deliver the notifications already queued, then exit
+            self._notify_queue.put(None)
+            try:
+                self._notify_thread.join(timeout=5)
+            except Exception:
+                pass
+            self._notify_thread = None
+        if self._executor:
+            # Running account checks finish on their own; nothing new is submitted once the loop exits
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        # Close the pooled broker connections; clients are recreated on demand after a restart
+        with self._cache_lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
         logger.debug("[STOPPED] Order Status Poller stopped")
 
     def add_order(self, execution_id: int, account, order_id: str, strategy_name: str):
         """Add an order to the polling queue"""
+        # Built before taking the lock: get_api_key() decrypts, and the account
+        # attributes may load from the DB
+        now = time.monotonic()
+        order_info = PendingOrder(
+            account_id=account.id,
+            account_name=account.account_name,
+            api_key=account.get_api_key(),
+            host_url=account.host_url,
+            order_id=order_id,
+            strategy_name=strategy_name,
+            added_time=now,
+            next_check_time=now + self.POLL_BACKOFF_BASE
+        )
         with self._lock:
-            self.pending_orders[execution_id] = {
-                'account_id': account.id,
-                'account_name': account.account_name,
-                'api_key': account.get_api_key(),
-                'host_url': account.host_url,
-                'order_id': order_id,
-                'strategy_name': strategy_name,
-                'added_time': datetime.utcnow(),
-                'check_count': 0
-            }
-            logger.debug(f"[POLLER] Added order {order_id} (execution {execution_id}) to polling queue. "
-                       f"Queue size: {len(self.pending_orders)}")
+            self._enqueue(execution_id, order_info)
+            logger.debug("[POLLER] Added order %s (execution %s) to polling queue. Queue size: %d",
+                         order_id, execution_id, len(self.pending_orders))
+        self._wake.set()
 
     def remove_order(self, execution_id: int):
         """Remove an order from the polling queue"""
         with self._lock:
-            order_info = self.pending_orders.pop(execution_id, None)
+            order_info = self._dequeue(execution_id)
             if order_info:
-                logger.debug(f"[POLLER] Removed order {order_info['order_id']} (execution {execution_id}) from polling queue. "
-                           f"Queue size: {len(self.pending_orders)}")
+                logger.debug("[POLLER] Removed order %s (execution %s) from polling queue. Queue size: %d",
+                             order_info.order_id, execution_id, len(self.pending_orders))
                 return True
             return False
 
+    def _enqueue(self, execution_id: int, order_info: PendingOrder):
+        """Put an order in pending_orders and the schedule (caller holds _lock)"""
+        self.pending_orders[execution_id] = order_info
+        heapq.heappush(self._schedule, (order_info.next_check_time, execution_id))
+
+    def _dequeue(self, execution_id: int):
+        """Remove an order from pending_orders; its schedule entry goes stale (caller holds _lock)"""
+        return self.pending_orders.pop(execution_id, None)
+
     def _poll_loop(self):
         """Main polling loop - runs in background
 
         OPTIMIZED: Uses stored Flask app reference instead of creating a new one.
+        Each account's check runs on its own worker and the loop does not wait
+        for it, so a slow broker only delays its own account's orders.
         """
-        import concurrent.futures
-
         # Use stored Flask app, or create one if not set (fallback)
         if self.flask_app:
             app = self.flask_app
@@ -119,98 +217,288 @@ class OrderStatusPoller:
             app = create_app()
             logger.warning("[POLLER] No Flask app reference set, created new one (not recommended)")
 
-        with app.app_context():
-            while self.is_running:
-                try:
-                    # Get copy of pending orders to avoid lock during API calls
-                    with self._lock:
-                        orders_to_check = dict(self.pending_orders)
+        # PositionMonitor notifications run on their own thread, off the account workers
+        self._notify_thread = threading.Thread(target=self._notify_loop, args=(app,), daemon=True,
+                                               name="OrderStatusNotifier")
+        self._notify_thread.start()
 
-                    if not orders_to_check:
-                        sleep(2)  # Wait 2 seconds if no orders
-                        continue
+        # Account check workers, each holding one app context for its lifetime
+        self._executor = ThreadPoolExecutor(max_workers=self.ACCOUNT_WORKERS,
+                                            thread_name_prefix="OrderStatusPollerWorker",
+                                            initializer=self._init_worker, initargs=(app,))
 
-                    logger.debug(f"[POLLING] Checking {len(orders_to_check)} pending orders")
-
-                    # Group orders by account for parallel checking
-                    # Rate limit is per-account, so different accounts can be checked in parallel
-                    orders_by_account = {}
-                    for execution_id, order_info in orders_to_check.items():
-                        account_key = f"{order_info['account_id']}_{order_info['account_name']}"
-                        if account_key not in orders_by_account:
-                            orders_by_account[account_key] = []
-                        orders_by_account[account_key].append((execution_id, order_info))
-
-                    # Check orders from different accounts in parallel
-                    # Each account's orders are checked sequentially (rate limit)
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=min(10, len(orders_by_account))) as executor:
-                        futures = []
-                        for account_key, account_orders in orders_by_account.items():
-                            # Submit one task per account - it will check all orders for that account
-                            future = executor.submit(
-                                self._check_account_orders,
-                                account_orders,
-                                app
-                            )
-                            futures.append(future)
-
-                        # Wait for all account checks to complete
-                        concurrent.futures.wait(futures, timeout=30)
-
-                    # Wait 1 second before next polling cycle (faster updates)
-                    sleep(1)
+        # The loop itself does no DB work: each account worker pushes its own app context
+        while self.is_running:
+            try:
+                orders_by_account, next_due = self._collect_due_orders()
 
-                except Exception as e:
-                    logger.error(f"[ERROR] Error in polling loop: {e}", exc_info=True)
-                    sleep(3)  # Wait on error
+                # Logging args are formatted lazily; the count is only summed when debug is on
+                if orders_by_account and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[POLLING] Checking %d pending orders across %d accounts",
+                                 sum(map(len, orders_by_account.values())), len(orders_by_account))
+
+                # Check orders from different accounts in parallel
+                # Each account's orders are checked sequentially (rate limit)
+                for account_key, account_orders in orders_by_account.items():
+                    self._executor.submit(self._check_account_orders, account_key, account_orders, app)
+
+                # Wait until the next order is due (or an account check finishes)
+                self._wait(self._poll_delay(next_due))
+
+            except Exception as e:
+                logger.error(f"[ERROR] Error in polling loop: {e}", exc_info=True)
+                self._wait(3)  # Wait on error
+
+    def _wait(self, timeout):
+        """Sleep up to timeout seconds, waking early when an order is added or the poller stops"""
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def _collect_due_orders(self):
+        """
+        Pop the orders due for a check off the schedule, grouped by account (the
+        pairs reference the live entries, nothing is copied), and return them
+        with the time the next order falls due (None if none are scheduled)
+        Orders of an account whose previous check is still running are held
+        until it finishes; rate limit is per-account, so different accounts can
+        be checked in parallel
+        """
+        now = time.monotonic()
+        orders_by_account = {}
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                check_time, execution_id = heapq.heappop(self._schedule)
+                order_info = self.pending_orders.get(execution_id)
+                if order_info is None or order_info.next_check_time != check_time:
+                    continue  # Removed or rescheduled since this entry was pushed
+                account_key = order_info.account_key
+                if account_key in self._accounts_in_flight:
+                    self._held.setdefault(account_key, set()).add(execution_id)
+                    continue
+                orders_by_account.setdefault(account_key, {})[execution_id] = order_info
+            self._accounts_in_flight.update(orders_by_account)
+            next_due = self._schedule[0][0] if self._schedule else None
+        return {account_key: list(orders.items()) for account_key, orders in orders_by_account.items()}, next_due
 
-    def _check_account_orders(self, account_orders: list, app):
+    def _poll_delay(self, next_due):
+        """Seconds to wait for next_due (from _collect_due_orders)"""
+        if next_due is None:
+            return self.POLL_IDLE_INTERVAL
+
+        return min(max(next_due - time.monotonic(), self.POLL_MIN_INTERVAL), self.poll_max_interval)
+
+    @staticmethod
+    def _init_worker(app):
+        """
+        Push an app context on a new worker thread and keep it: workers don't
+        inherit the poll loop's context, and pushing one per batch is wasted work
+        """
+        app.app_context().push()
+
+    def _check_account_orders(self, account_key: str, account_orders: list, app):
         """Check all orders for a single account (called in parallel for different accounts)
 
-        IMPORTANT: This runs in a ThreadPoolExecutor thread which does NOT inherit
-        the app context from the parent thread. We must create our own context here.
+        IMPORTANT: This runs on a pool worker, inside the app context _init_worker
+        pushed for that thread; the session is removed after each batch instead of
+        on context teardown.
         """
-        # ThreadPoolExecutor threads need their own app context
-        with app.app_context():
+        try:
+            # Several orders due on one account that the orderbook can answer: one call covers
+            # them all. A failed fetch counts as a miss, so those orders go to orderstatus
+            # next instead of triggering the orderbook again
+            book_orders = [order_info for _, order_info in account_orders if self._can_use_order_book(order_info)]
+            order_book = None
+            if len(book_orders) > 1 and not self._seconds_until_account_free(account_key):
+                order_book = self._fetch_order_book(book_orders[0]) or {}
+            # And one query loads all their executions, with the legs fills and P&L read
+            executions = {
+                execution.id: execution
+                for execution in StrategyExecution.query.options(
+                    joinedload(StrategyExecution.leg)
+                ).filter(
+                    StrategyExecution.id.in_([execution_id for execution_id, _ in account_orders])
+                ).all()
+            }
+            # Updates are committed once for the whole batch; notifications wait
+            # for that commit, and queue changes are applied together under one
+            # lock acquisition instead of one per order
+            after_commit = []
+            queue_updates = {}
             for execution_id, order_info in account_orders:
-                self._check_order_status(execution_id, order_info, app)
+                self._check_order_status(execution_id, order_info, app, order_book, executions,
+                                         after_commit, queue_updates)
 
-    def _check_order_status(self, execution_id: int, order_info: Dict, app):
-        """Check status of a single order"""
-        account_key = f"{order_info['account_id']}_{order_info['account_name']}"
-        order_id = order_info['order_id']
-        strategy_name = order_info['strategy_name']
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"[ERROR] Batch commit failed for account {account_key}, retrying order by order: {e}")
+                for execution_id, order_info in account_orders:
+                    self._check_order_status(execution_id, order_info, app, order_book)
+            else:
+                self._apply_queue_updates(queue_updates)
+                for action in after_commit:
+                    action()
+        except Exception as e:
+            logger.error(f"[ERROR] Error checking orders for account {account_key}: {e}", exc_info=True)
+        finally:
+            # Put the batch's orders (at their new check times) and any held ones back on the schedule
+            with self._lock:
+                self._accounts_in_flight.discard(account_key)
+                execution_ids = {execution_id for execution_id, _ in account_orders}
+                execution_ids.update(self._held.pop(account_key, ()))
+                for execution_id in execution_ids:
+                    order_info = self.pending_orders.get(execution_id)
+                    if order_info is not None:
+                        heapq.heappush(self._schedule, (order_info.next_check_time, execution_id))
+            self._wake.set()  # Let the loop reschedule this account
+            # Context stays pushed on this worker, so release the session here
+            db.session.remove()
+
+    def _get_client(self, api_key: str, host_url: str) -> ExtendedOpenAlgoAPI:
+        """One API client per account, kept so its HTTP connection is reused across polls"""
+        key = (api_key, host_url)
+        client = self._clients.get(key)
+        if client is None:
+            with self._cache_lock:
+                client = self._clients.setdefault(key, ExtendedOpenAlgoAPI(api_key=api_key, host=host_url))
+        return client
+
+    def _seconds_until_account_free(self, account_key: str) -> float:
+        """Time left before the 1 req/sec/account rate limit allows another call (0 if free)"""
+        # Integer nanosecond compare: this runs before every order check
+        remaining_ns = self.last_check_time.get(account_key, 0) + self.RATE_LIMIT_NS - time.monotonic_ns()
+        if remaining_ns > 0:
+            return remaining_ns / 1e9
+        return 0
+
+    def _reserve_call_slot(self, account_key: str) -> float:
+        """
+        Give a rate-limited order its own upcoming 1s call slot on the account
+        (time.monotonic() seconds), so orders deferred together don't all fall
+        due at the same instant and compete for one slot again
+        """
+        slot_ns = max(self.last_check_time.get(account_key, 0) + self.RATE_LIMIT_NS,
+                      self._reserved_slots.get(account_key, 0))
+        self._reserved_slots[account_key] = slot_ns + self.RATE_LIMIT_NS
+        return slot_ns / 1e9
 
-        # Rate limiting: Ensure 1 second between checks per account
-        now = datetime.utcnow()
+    def _can_use_order_book(self, order_info: PendingOrder) -> bool:
+        """Whether an orderbook fetch would settle this order's check (see _check_account_orders)"""
+        return (not order_info.price_refetches and not order_info.book_missed
+                and self._get_cached_status(order_info.account_key, order_info.order_id) is None)
 
-        if account_key in self.last_check_time:
-            time_since_last_check = (now - self.last_check_time[account_key]).total_seconds()
-            if time_since_last_check < 1.0:
-                # Skip this check to respect rate limit
-                return
+    def _fetch_order_book(self, order_info: PendingOrder):
+        """
+        Fetch the account's orderbook once for a polling cycle (or a sync of
+        several of its orders; any object with the account fields will do)
+        Returns {order_id: order row} or None if rate limited or the call failed
+        """
+        account_key = order_info.account_key
+        if self._seconds_until_account_free(account_key):
+            return None
+
+        try:
+            client = self._get_client(order_info.api_key, order_info.host_url)
+            response = client.orderbook()
+            self.last_check_time[account_key] = time.monotonic_ns()
+
+            if response.get('status') != 'success':
+                logger.warning(f"[WARNING] Failed to get orderbook for {order_info.account_name}: {response.get('message')}")
+                return None
+
+            orders = response.get('data', {}).get('orders', [])
+            return {str(order.get('orderid')): order for order in orders}
+
+        except Exception as e:
+            logger.error(f"[ERROR] Error fetching orderbook for {order_info.account_name}: {e}")
+            return None
+
+    def _get_cached_status(self, account_key: str, order_id: str):
+        """orderstatus response fetched for this order within STATUS_CACHE_TTL, or None"""
+        cached = self._status_cache.get((account_key, order_id))
+        if cached and time.monotonic() - cached[0] < self.STATUS_CACHE_TTL:
+            return cached[1]
+        return None
+
+    def _cache_status(self, account_key: str, order_id: str, response: Dict):
+        """Remember a successful orderstatus response, dropping expired ones"""
+        if response.get('status') != 'success':
+            return
+        # Stamped after the call returns, so the TTL counts from when the data arrived
+        now = time.monotonic()
+        with self._cache_lock:
+            for key in [key for key, (fetched_at, _) in self._status_cache.items()
+                        if now - fetched_at >= self.STATUS_CACHE_TTL]:
+                del self._status_cache[key]
+            self._status_cache[(account_key, order_id)] = (now, response)
+
+    def _check_order_status(self, execution_id: int, order_info: PendingOrder, app, order_book: Dict = None,
+                            executions: Dict = None, after_commit: List = None, queue_updates: Dict = None):
+        """
+        Check status of a single order
+        Uses its row from order_book when given, or a status fetched moments ago
+        for another execution of the same order, otherwise calls orderstatus
+        executions: preloaded {execution_id: StrategyExecution} for the batch, if any
+        after_commit: when given, DB changes are left for the caller to commit and
+        follow-up actions are appended here instead of run (see _commit)
+        queue_updates: when given, changes to pending_orders are collected here
+        for the caller to apply (see _update_pending)
+        """
+        account_key, account_name = order_info.account_key, order_info.account_name
+        order_id, strategy_name = order_info.order_id, order_info.strategy_name
+        check_count = order_info.check_count  # Checks done before this one
+        # An order waiting for its average_price goes to orderstatus, which carries it
+        book_row = order_book.get(str(order_id)) if order_book and not order_info.price_refetches else None
+        if book_row is not None:
+            # Orderbook rows carry the same order_status field; a missing
+            # average_price falls through to the orderstatus re-fetch below
+            response = {'status': 'success', 'data': book_row}
+        else:
+            if order_book is not None and not order_info.price_refetches:
+                # The orderbook was fetched for it but can't answer: use orderstatus from now on
+                self._update_pending(execution_id, {'book_missed': True}, queue_updates)
+            response = self._get_cached_status(account_key, order_id)
+
+        # Rate limiting: Ensure 1 second between checks per account
+        # (not needed when the status is already known)
+        wait = self._seconds_until_account_free(account_key) if response is None else 0
+        if wait:
+            # Skip this check to respect rate limit. Orders the orderbook can answer
+            # retry together once the account is free (one orderbook call for all);
+            # the rest each get their own slot for an orderstatus call
+            if order_book is None and self._can_use_order_book(order_info):
+                check_time = time.monotonic() + wait
+            else:
+                check_time = self._reserve_call_slot(account_key)
+            if not self._drop_if_expired(execution_id, order_info, queue_updates):
+                self._update_pending(execution_id, {'next_check_time': check_time}, queue_updates)
+            return
 
         try:
             # Fetch order status
-            client = ExtendedOpenAlgoAPI(
-                api_key=order_info['api_key'],
-                host=order_info['host_url']
-            )
+            client = self._get_client(order_info.api_key, order_info.host_url)
 
-            response = client.orderstatus(order_id=order_id, strategy=strategy_name)
-            self.last_check_time[account_key] = datetime.utcnow()
+            if response is None:
+                response = client.orderstatus(order_id=order_id, strategy=strategy_name)
+                self.last_check_time[account_key] = time.monotonic_ns()
+                self._cache_status(account_key, order_id, response)
 
             if response.get('status') == 'success':
-                data = response.get('data', {})
+                # A success response always carries data; a missing key is an API
+                # contract break and should surface as an error, not an empty status
+                data = response['data']
                 broker_status = data.get('order_status')  # OpenAlgo API returns 'order_status' not 'status'
-                avg_price = data.get('average_price', 0)
+                avg_price = data.get('average_price') or 0
 
-                # Update database (app context already established by _poll_loop)
-                execution = StrategyExecution.query.get(execution_id)
+                # Update database (app context already established by _check_account_orders)
+                if executions is not None:
+                    execution = executions.get(execution_id)
+                else:
+                    execution = StrategyExecution.query.get(execution_id)
                 if not execution:
                     # Order no longer exists, remove from queue
-                    with self._lock:
-                        self.pending_orders.pop(execution_id, None)
+                    self._update_pending(execution_id, None, queue_updates)
                     logger.warning(f"[WARNING] Execution {execution_id} not found in DB, removed from queue")
                     return
 
@@ -220,36 +508,27 @@ class OrderStatusPoller:
                     # IMPORTANT: Use order_id comparison instead of status to avoid race condition
                     # Status can be changed by sync_order_status (called from frontend poll) before
                     # the background poller checks, leading to entry orders being treated as exits
-                    is_entry_order = execution.order_id == order_id and execution.exit_order_id != order_id
                     is_exit_order = execution.exit_order_id == order_id
+                    is_entry_order = not is_exit_order and execution.order_id == order_id
 
-                    # If average_price is missing/zero, retry multiple times with increasing delays
+                    # If average_price is missing/zero, re-check later with increasing delays
                     # Some brokers return complete status before average_price is populated
+                    # (scheduled rather than slept, so this account's other orders aren't held up)
+                    price_refetches = order_info.price_refetches
                     if not avg_price or avg_price == 0:
-                        logger.warning(f"[PRICE MISSING] Order {order_id} complete but average_price is {avg_price}, retrying...")
-
-                        # Try up to 3 times with increasing delays (1s, 2s, 3s)
-                        for price_retry in range(3):
-                            sleep(price_retry + 1)  # 1s, 2s, 3s delays
-
-                            retry_response = client.orderstatus(order_id=order_id, strategy=strategy_name)
-                            self.last_check_time[account_key] = datetime.utcnow()
-
-                            if retry_response.get('status') == 'success':
-                                retry_data = retry_response.get('data', {})
-                                retry_avg_price = retry_data.get('average_price', 0)
-
-                                if retry_avg_price and retry_avg_price > 0:
-                                    avg_price = retry_avg_price
-                                    logger.info(f"[PRICE FETCHED] Order {order_id} average_price after retry {price_retry + 1}: Rs.{avg_price}")
-                                    break
-                                else:
-                                    logger.warning(f"[PRICE RETRY {price_retry + 1}] Order {order_id} average_price still {retry_avg_price}")
-                            else:
-                                logger.warning(f"[RETRY FAILED] Failed to re-fetch order {order_id}: {retry_response.get('message')}")
-
-                        if not avg_price or avg_price == 0:
-                            logger.error(f"[PRICE FAILED] Order {order_id} could not get average_price after 3 retries!")
+                        if price_refetches < self.PRICE_REFETCH_ATTEMPTS:
+                            delay = price_refetches + 1  # 1s, 2s, 3s delays
+                            logger.warning(f"[PRICE MISSING] Order {order_id} complete but average_price is {avg_price}, "
+                                           f"re-checking in {delay}s (retry {price_refetches + 1})")
+                            self._update_pending(execution_id, {
+                                'price_refetches': price_refetches + 1,
+                                'next_check_time': time.monotonic() + delay
+                            }, queue_updates)
+                            return
+
+                        logger.error(f"[PRICE FAILED] Order {order_id} could not get average_price after {price_refetches} retries!")
+                    elif price_refetches:
+                        logger.info(f"[PRICE FETCHED] Order {order_id} average_price after retry {price_refetches}: Rs.{avg_price}")
 
                     if is_entry_order:
                         execution.status = 'entered'
@@ -266,17 +545,14 @@ class OrderStatusPoller:
                         if execution.leg and not execution.leg.is_executed:
                             execution.leg.is_executed = True
 
-                        db.session.commit()
-
-                        # Notify PositionMonitor of new filled order
-                        try:
-                            position_monitor = get_position_monitor()
-                            position_monitor.on_order_filled(execution)
-                            logger.debug(f"[POSITION MONITOR] Notified of order fill: {order_id}")
-                        except Exception as e:
-                            logger.error(f"[POSITION MONITOR] Error notifying order fill: {e}")
+                        # Notify PositionMonitor of new filled order and remove from polling queue
+                        self._commit(
+                            after_commit,
+                            partial(self._notify_position_monitor, 'on_order_filled', execution_id, order_id)
+                        )
+                        self._update_pending(execution_id, None, queue_updates)
 
-                        logger.info(f"[FILLED] Entry order {order_id} FILLED at Rs.{avg_price} ({order_info['account_name']})")
+                        logger.info(f"[FILLED] Entry order {order_id} FILLED at Rs.{avg_price} ({account_name})")
 
                     elif is_exit_order:
                         execution.status = 'exited'
@@ -298,17 +574,14 @@ class OrderStatusPoller:
                                 execution.realized_pnl = execution.unrealized_pnl
                         execution.exit_time = datetime.utcnow()
 
-                        db.session.commit()
-
-                        # Notify PositionMonitor of position closure
-                        try:
-                            position_monitor = get_position_monitor()
-                            position_monitor.on_position_closed(execution)
-                            logger.debug(f"[POSITION MONITOR] Notified of position close: {order_id}")
-                        except Exception as e:
-                            logger.error(f"[POSITION MONITOR] Error notifying position close: {e}")
+                        # Notify PositionMonitor of position closure and remove from polling queue
+                        self._commit(
+                            after_commit,
+                            partial(self._notify_position_monitor, 'on_position_closed', execution_id, order_id)
+                        )
+                        self._update_pending(execution_id, None, queue_updates)
 
-                        logger.info(f"[CLOSED] Exit order {order_id} FILLED at Rs.{avg_price} ({order_info['account_name']})")
+                        logger.info(f"[CLOSED] Exit order {order_id} FILLED at Rs.{avg_price} ({account_name})")
 
                     else:
                         # Edge case: order_id doesn't match either entry or exit
@@ -316,56 +589,138 @@ class OrderStatusPoller:
                         # Skip processing but log for debugging
                         logger.warning(f"[WARNING] Order {order_id} doesn't match execution's order_id ({execution.order_id}) or exit_order_id ({execution.exit_order_id}), skipping")
 
-                    # Remove from polling queue (only if we processed it)
-                    if is_entry_order or is_exit_order:
-                        with self._lock:
-                            self.pending_orders.pop(execution_id, None)
-
                 elif broker_status in ['rejected', 'cancelled']:
                     execution.status = 'failed'
                     execution.broker_order_status = broker_status
-                    db.session.commit()
 
-                    # Notify PositionMonitor of cancelled order
-                    try:
-                        position_monitor = get_position_monitor()
-                        position_monitor.on_order_cancelled(execution)
-                        logger.debug(f"[POSITION MONITOR] Notified of order cancel: {order_id}")
-                    except Exception as e:
-                        logger.error(f"[POSITION MONITOR] Error notifying order cancel: {e}")
+                    # Notify PositionMonitor of cancelled order and remove from polling queue
+                    self._commit(
+                        after_commit,
+                        partial(self._notify_position_monitor, 'on_order_cancelled', execution_id, order_id)
+                    )
+                    self._update_pending(execution_id, None, queue_updates)
 
-                    # Remove from polling queue
-                    with self._lock:
-                        self.pending_orders.pop(execution_id, None)
-
-                    logger.warning(f"[REJECTED] Order {order_id} {broker_status.upper()} ({order_info['account_name']})")
+                    logger.warning(f"[REJECTED] Order {order_id} {broker_status.upper()} ({account_name})")
 
                 else:  # Still 'open'
-                    execution.broker_order_status = 'open'
-                    db.session.commit()
+                    # Only written on the first open check, not re-committed every poll
+                    if execution.broker_order_status != 'open':
+                        execution.broker_order_status = 'open'
+                        self._commit(after_commit)
 
-                    # Increment check count
-                    with self._lock:
-                        if execution_id in self.pending_orders:
-                            self.pending_orders[execution_id]['check_count'] += 1
+                    # Increment check count and back off the next check
+                    self._schedule_next_check(execution_id, order_info, queue_updates)
 
-                    logger.debug(f"[PENDING] Order {order_id} still OPEN (check #{order_info['check_count']})")
+                    logger.debug("[PENDING] Order %s still OPEN (check #%d)", order_id, check_count + 1)
 
-                # Extended timeout: Remove after 8 hours (28800 seconds) for LIMIT orders
-                # LIMIT orders can take much longer to fill than MARKET orders
-                # Only remove if order has been open for too long (likely stale/forgotten)
-                order_age = (datetime.utcnow() - order_info['added_time']).total_seconds()
-                max_age_seconds = 28800  # 8 hours - allows full trading day for LIMIT orders
+                    if self.max_checks and check_count + 1 >= self.max_checks:
+                        self._update_pending(execution_id, None, queue_updates)
+                        logger.warning(f"[TIMEOUT] Order {order_id} removed from polling (still open after {check_count + 1} checks)")
 
-                if order_age > max_age_seconds:
-                    with self._lock:
-                        self.pending_orders.pop(execution_id, None)
-                    logger.warning(f"[TIMEOUT] Order {order_id} removed from polling (timeout after {int(order_age)}s / {max_age_seconds}s max)")
+                self._drop_if_expired(execution_id, order_info, queue_updates)
             else:
                 logger.warning(f"[WARNING] Failed to get status for order {order_id}: {response.get('message')}")
+                self._schedule_next_check(execution_id, order_info, queue_updates)
 
         except Exception as e:
             logger.error(f"[ERROR] Error checking order {order_id}: {e}")
+            if after_commit is None:
+                db.session.rollback()
+            self._schedule_next_check(execution_id, order_info, queue_updates)
+
+    def _drop_if_expired(self, execution_id: int, order_info: PendingOrder, queue_updates: Dict = None) -> bool:
+        """
+        Extended timeout: Remove after max_age_seconds (8 hours by default) for LIMIT orders
+        LIMIT orders can take much longer to fill than MARKET orders
+        Only remove if order has been open for too long (likely stale/forgotten)
+        Returns True if the order was removed
+        """
+        order_age = time.monotonic() - order_info.added_time
+
+        if order_age > self.max_age_seconds:
+            self._update_pending(execution_id, None, queue_updates)
+            logger.warning(f"[TIMEOUT] Order {order_info.order_id} removed from polling (timeout after {int(order_age)}s / {self.max_age_seconds}s max)")
+            return True
+        return False
+
+    def _commit(self, after_commit: List, *actions):
+        """
+        Commit this order's changes and run the follow-up actions, or, when
+        checking a batch (after_commit given), leave the commit to the caller
+        and queue the actions to run once it succeeds
+        """
+        if after_commit is None:
+            db.session.commit()
+            for action in actions:
+                action()
+        else:
+            after_commit.extend(actions)
+
+    def _update_pending(self, execution_id: int, changes: Dict = None, queue_updates: Dict = None):
+        """
+        Merge changes into an order's pending_orders entry, or remove the entry
+        when changes is None. With queue_updates given (batch checks) the change
+        is only recorded there, for _apply_queue_updates after the batch commit
+        """
+        if queue_updates is None:
+            self._apply_queue_updates({execution_id: changes})
+        elif changes is None:
+            queue_updates[execution_id] = None
+        elif execution_id not in queue_updates:
+            queue_updates[execution_id] = dict(changes)
+        elif queue_updates[execution_id] is not None:
+            queue_updates[execution_id].update(changes)
+
+    def _apply_queue_updates(self, queue_updates: Dict):
+        """Apply collected {execution_id: {field: value} or None} to pending_orders under a single lock"""
+        if not queue_updates:
+            return
+        with self._lock:
+            for execution_id, changes in queue_updates.items():
+                if changes is None:
+                    self._dequeue(execution_id)
+                elif execution_id in self.pending_orders:
+                    pending = self.pending_orders[execution_id]
+                    for name, value in changes.items():
+                        setattr(pending, name, value)
+
+    def _notify_position_monitor(self, event: str, execution_id: int, order_id: str):
+        """
+        Queue PositionMonitor.<event>(execution) (on_order_filled, on_position_closed,
+        on_order_cancelled) for the notifier thread, so a slow monitor doesn't hold
+        up the account's order checks
+        """
+        self._notify_queue.put((event, execution_id, order_id))
+
+    def _notify_loop(self, app):
+        """Deliver queued PositionMonitor notifications with a freshly loaded execution"""
+        while True:
+            item = self._notify_queue.get()
+            if item is None:
+                break
+            event, execution_id, order_id = item
+            try:
+                with app.app_context():
+                    execution = StrategyExecution.query.get(execution_id)
+                    if not execution:
+                        logger.warning(f"[POSITION MONITOR] Execution {execution_id} not found, skipping {event}")
+                        continue
+                    position_monitor = get_position_monitor()
+                    getattr(position_monitor, event)(execution)
+                    logger.debug("[POSITION MONITOR] Notified %s: %s", event, order_id)
+            except Exception as e:
+                logger.error(f"[POSITION MONITOR] Error notifying {event}: {e}")
+
+    def _schedule_next_check(self, execution_id: int, order_info: PendingOrder, queue_updates: Dict = None):
+        """Push an order's next check out exponentially (POLL_BACKOFF_BASE doubling, up to poll_max_interval)"""
+        check_count = order_info.check_count
+        # Exponent capped so long-open orders don't overflow the float
+        self._update_pending(execution_id, {
+            'next_check_time': time.monotonic() + min(
+                self.POLL_BACKOFF_BASE * 2 ** min(check_count, 16), self.poll_max_interval
+            ),
+            'check_count': check_count + 1
+        }, queue_updates)
 
     def get_status(self):
         """Get current poller status (for monitoring)"""
@@ -373,7 +728,7 @@ class OrderStatusPoller:
             return {
                 'is_running': self.is_running,
                 'pending_orders_count': len(self.pending_orders),
-                'pending_order_ids': [info['order_id'] for info in self.pending_orders.values()]
+                'pending_order_ids': [info.order_id for info in self.pending_orders.values()]
             }
 
     def recover_pending_orders(self, app=None):
@@ -387,10 +742,14 @@ class OrderStatusPoller:
                 ctx = app.app_context()
                 ctx.push()
 
-            from app.models import StrategyExecution, TradingAccount
+            from app.models import StrategyExecution
 
-            # Find all pending orders that need tracking (both entry and exit pending)
-            pending_executions = StrategyExecution.query.filter(
+            # Find all pending orders that need tracking (both entry and exit pending),
+            # with their accounts and strategies in the same query
+            pending_executions = StrategyExecution.query.options(
+                joinedload(StrategyExecution.account),
+                joinedload(StrategyExecution.strategy)
+            ).filter(
                 StrategyExecution.status.in_(['pending', 'exit_pending']),
                 StrategyExecution.order_id.isnot(None)
             ).all()
@@ -402,7 +761,7 @@ class OrderStatusPoller:
                     continue
 
                 # Get account details
-                account = TradingAccount.query.get(execution.account_id)
+                account = execution.account
                 if not account or not account.is_active:
                     logger.warning(f"[RECOVERY] Skipping execution {execution.id}: account inactive or not found")
                     continue
@@ -420,22 +779,26 @@ class OrderStatusPoller:
                 else:
                     order_id_to_poll = execution.order_id
 
-                # Add to polling queue
+                # Add to polling queue (entry built outside the lock, as in add_order)
+                now = time.monotonic()
+                order_info = PendingOrder(
+                    account_id=account.id,
+                    account_name=account.account_name,
+                    api_key=account.get_api_key(),
+                    host_url=account.host_url,
+                    order_id=order_id_to_poll,
+                    strategy_name=strategy_name,
+                    added_time=now,  # Reset timer for recovered orders
+                    next_check_time=now  # Check right away
+                )
                 with self._lock:
-                    self.pending_orders[execution.id] = {
-                        'account_id': account.id,
-                        'account_name': account.account_name,
-                        'api_key': account.get_api_key(),
-                        'host_url': account.host_url,
-                        'order_id': order_id_to_poll,
-                        'strategy_name': strategy_name,
-                        'added_time': datetime.utcnow(),  # Reset timer for recovered orders
-                        'check_count': 0
-                    }
+                    self._enqueue(execution.id, order_info)
                     recovered_count += 1
-                    logger.debug(f"[RECOVERY] Recovered {execution.status} order {order_id_to_poll} for execution {execution.id}")
+                    logger.debug("[RECOVERY] Recovered %s order %s for execution %s",
+                                 execution.status, order_id_to_poll, execution.id)
 
             if recovered_count > 0:
+                self._wake.set()
                 logger.debug(f"[RECOVERY] Recovered {recovered_count} pending orders to polling queue")
             else:
                 logger.debug(f"[RECOVERY] No pending orders to recover")
@@ -449,11 +812,13 @@ class OrderStatusPoller:
             logger.error(f"[RECOVERY] Error recovering pending orders: {e}", exc_info=True)
             return 0
 
-    def sync_order_status(self, execution_id: int, app=None) -> dict:
+    def sync_order_status(self, execution_id: int, app=None, after_commit: List = None) -> dict:
         """
         Manually sync a single order's status from broker.
         Used when refresh is triggered to ensure latest state.
         Returns updated status dict.
+        after_commit: when given, the update is left for the caller to commit and
+        the polling-queue follow-up is appended here (see _commit)
         """
         try:
             if app:
@@ -476,10 +841,7 @@ class OrderStatusPoller:
                 return {'status': 'error', 'message': 'Account not found'}
 
             # Fetch status from broker
-            client = ExtendedOpenAlgoAPI(
-                api_key=account.get_api_key(),
-                host=account.host_url
-            )
+            client = self._get_client(account.get_api_key(), account.host_url)
 
             strategy_name = execution.strategy.name if execution.strategy else 'Unknown'
 
@@ -491,12 +853,17 @@ class OrderStatusPoller:
             if not order_id_to_check:
                 return {'status': 'error', 'message': f'No order_id found for status {execution.status}'}
 
-            response = client.orderstatus(order_id=order_id_to_check, strategy=strategy_name)
+            # sync_all_pending_orders syncs every execution, so mirrored ones share a fetch
+            account_key = account_key_for(account.id, account.account_name)
+            response = self._get_cached_status(account_key, order_id_to_check)
+            if response is None:
+                response = client.orderstatus(order_id=order_id_to_check, strategy=strategy_name)
+                self._cache_status(account_key, order_id_to_check, response)
 
             if response.get('status') == 'success':
-                data = response.get('data', {})
+                data = response['data']
                 broker_status = data.get('order_status')
-                avg_price = data.get('average_price', 0)
+                avg_price = data.get('average_price') or 0
 
                 old_status = execution.status
                 old_broker_status = execution.broker_order_status
@@ -513,11 +880,9 @@ class OrderStatusPoller:
                             execution.entry_time = datetime.utcnow()
                         if execution.leg and not execution.leg.is_executed:
                             execution.leg.is_executed = True
-                        db.session.commit()
 
                         # Remove from polling queue if present
-                        with self._lock:
-                            self.pending_orders.pop(execution_id, None)
+                        self._commit(after_commit, partial(self._update_pending, execution_id, None))
 
                         logger.info(f"[SYNC] Entry order {order_id_to_check} synced: {old_status}->{execution.status}")
 
@@ -534,37 +899,28 @@ class OrderStatusPoller:
                                 else:
                                     execution.realized_pnl = (execution.entry_price - avg_price) * execution.quantity
                         execution.exit_time = datetime.utcnow()
-                        db.session.commit()
 
                         # Remove from polling queue if present
-                        with self._lock:
-                            self.pending_orders.pop(execution_id, None)
+                        self._commit(after_commit, partial(self._update_pending, execution_id, None))
 
                         logger.info(f"[SYNC] Exit order {order_id_to_check} synced: {old_status}->{execution.status}")
 
                 elif broker_status in ['rejected', 'cancelled']:
                     execution.status = 'failed'
                     execution.broker_order_status = broker_status
-                    db.session.commit()
 
                     # Remove from polling queue
-                    with self._lock:
-                        self.pending_orders.pop(execution_id, None)
+                    self._commit(after_commit, partial(self._update_pending, execution_id, None))
 
                     logger.info(f"[SYNC] Order {order_id_to_check} synced: {old_status}->{execution.status} ({broker_status})")
 
                 else:  # Still open
                     execution.broker_order_status = 'open'
-                    db.session.commit()
 
                     # Ensure it's in the polling queue
-                    if execution_id not in self.pending_orders:
-                        self.add_order(
-                            execution_id=execution.id,
-                            account=account,
-                            order_id=order_id_to_check,
-                            strategy_name=strategy_name
-                        )
+                    self._commit(after_commit, partial(
+                        self._ensure_polling, execution_id, account, order_id_to_check, strategy_name
+                    ))
 
                 if app:
                     ctx.pop()
@@ -592,6 +948,63 @@ class OrderStatusPoller:
                     pass
             return {'status': 'error', 'message': str(e)}
 
+    def _ensure_polling(self, execution_id: int, account, order_id: str, strategy_name: str):
+        """Queue an order that is still open at the broker, unless it is already being polled"""
+        if execution_id not in self.pending_orders:
+            self.add_order(
+                execution_id=execution_id,
+                account=account,
+                order_id=order_id,
+                strategy_name=strategy_name
+            )
+
+    def _prefetch_statuses(self, account):
+        """Cache orderstatus-shaped responses for an account's orders from one orderbook call"""
+        if not account:
+            return
+        account_info = SimpleNamespace(
+            account_key=account_key_for(account.id, account.account_name),
+            account_name=account.account_name,
+            api_key=account.get_api_key(),
+            host_url=account.host_url
+        )
+        order_book = self._fetch_order_book(account_info)
+        for order_id, row in (order_book or {}).items():
+            # Complete rows can lack average_price; leave those to orderstatus
+            if row.get('order_status') != 'complete' or row.get('average_price'):
+                self._cache_status(account_info.account_key, order_id, {'status': 'success', 'data': row})
+
+    def _sync_account_orders(self, app, account_id: int, execution_ids: List[int]) -> List[dict]:
+        """
+        Sync one account's pending orders for sync_all_pending_orders (runs on a
+        worker thread, in its own app context) and return their results
+        """
+        from app.models import TradingAccount
+
+        try:
+            with app.app_context():
+                # Several orders on one account: fetch its orderbook once and seed the
+                # status cache, so sync_order_status finds them without an orderstatus call each
+                if len(execution_ids) > 1:
+                    self._prefetch_statuses(TradingAccount.query.get(account_id))
+
+                # One commit for the account; queue follow-ups run once it succeeds
+                after_commit = []
+                results = [self.sync_order_status(execution_id, after_commit=after_commit)
+                           for execution_id in execution_ids]
+                try:
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"[SYNC ALL] Batch commit failed for account {account_id}, syncing order by order: {e}")
+                    return [self.sync_order_status(execution_id) for execution_id in execution_ids]
+                for action in after_commit:
+                    action()
+                return results
+        except Exception as e:
+            logger.error(f"[SYNC ALL] Error syncing orders for account {account_id}: {e}", exc_info=True)
+            return [{'status': 'error', 'message': str(e)} for _ in execution_ids]
+
     def sync_all_pending_orders(self, user_id: int = None, app=None) -> dict:
         """
         Sync all pending orders from broker.
@@ -626,9 +1039,24 @@ class OrderStatusPoller:
                 'errors': 0
             }
 
+            # Accounts are synced in parallel, each account's orders in turn
+            execution_ids_by_account = {}
             for execution in pending_executions:
-                result = self.sync_order_status(execution.id)
-
+                execution_ids_by_account.setdefault(execution.account_id, []).append(execution.id)
+
+            sync_results = []
+            if execution_ids_by_account:
+                flask_app = current_app._get_current_object()
+                max_workers = min(len(execution_ids_by_account), self.ACCOUNT_WORKERS)
+                with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="OrderSync") as executor:
+                    futures = [
+                        executor.submit(self._sync_account_orders, flask_app, account_id, execution_ids)
+                        for account_id, execution_ids in execution_ids_by_account.items()
+                    ]
+                    for future in as_completed(futures):
+                        sync_results.extend(future.result())
+
+            for result in sync_results:
                 if result.get('status') == 'success':
                     if result.get('updated'):
                         results['updated'] += 1
@@ -664,5 +1092,5 @@ class OrderStatusPoller:
             return {'status': 'error', 'message': str(e)}
 
 
-# Global singleton instance
+# Global singleton instance: created once at import, use this rather than OrderStatusPoller()
 order_status_poller = OrderStatusPoller()
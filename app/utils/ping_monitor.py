@@ -22,6 +22,7 @@ class PingMonitor:
         self.stop_monitoring = threading.Event()
         self.account_failure_counts = {}  # Track consecutive failures per account
         self.account_skip_counts = {}  # Skip checking accounts that are consistently failing
+        self.encryption_error_accounts = set()  # Accounts whose API key failed to decrypt (logged once)
         
         if app is not None:
             self.init_app(app)
@@ -87,9 +88,7 @@ class PingMonitor:
                     api_key = account.get_api_key()
                 except Exception as key_error:
                     # Mark account as having encryption issues and skip silently after first error
-                    if account.id not in getattr(self, 'encryption_error_accounts', set()):
-                        if not hasattr(self, 'encryption_error_accounts'):
-                            self.encryption_error_accounts = set()
+                    if account.id not in self.encryption_error_accounts:
                         self.encryption_error_accounts.add(account.id)
                         current_app.logger.error(f"Failed to decrypt API key for account {account.id} (encryption key mismatch - account needs to be re-added): {key_error}")
                     continue
@@ -11,10 +11,12 @@ Key Features:
 Uses standard threading for background tasks
 """
 import logging
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 import pytz
-from sqlalchemy import and_
+from sqlalchemy import and_, bindparam, func, or_, update
 from sqlalchemy.orm import joinedload
 
 from app import db
@@ -56,7 +58,9 @@ class PositionMonitor:
         self.is_running = False
         self.websocket_manager = None
         self.subscribed_symbols: Set[str] = set()
-        self.position_map: Dict[str, List[StrategyExecution]] = {}
+        # {symbol_exchange: [execution ids]} - ids only, ORM objects would be
+        # detached by the time the flush thread or a later request reads them
+        self.position_map: Dict[str, List[int]] = {}
         self.app = None  # Store Flask app instance for creating app context
 
         # Batch update mechanism for WebSocket price updates
@@ -67,6 +71,36 @@ class PositionMonitor:
         self._last_flush_time = None
         self._flush_thread = None
 
+        # Last queued LTP per symbol: {symbol_exchange: (ltp, time.monotonic() when queued)}
+        # Unchanged ticks are dropped, but re-queued after _ltp_heartbeat_interval so
+        # last_price_updated stays inside RiskManager's 60s staleness window
+        self._last_ltp: Dict[str, Tuple[float, float]] = {}
+        self._ltp_heartbeat_interval = 30.0
+
+        # should_start_monitoring is also polled by the admin dashboard - cache the
+        # primary account (as plain values) and its ping result instead of hitting
+        # the DB and the broker on every call
+        self._primary_account_cache = {'ts': 0.0, 'account': None}
+        self._primary_account_ttl = 60.0
+        self._ping_cache = {'ts': 0.0, 'ok': False}
+        self._ping_ttl = 10.0
+
+        # refresh_positions rescans at most once per _refresh_interval, however many
+        # callers (one per open risk status stream) ask; the interval grows while the
+        # set of open positions is unchanged and drops back as soon as it changes
+        self._refresh_interval = 5.0
+        self._refresh_min_interval = 5.0
+        self._refresh_max_interval = 60.0
+        self._refresh_backoff_factor = 1.5
+        self._refresh_prev_ids: Set[int] = set()
+        self._last_refresh = 0.0  # time.monotonic() of the last rescan
+        self._refresh_lock = threading.Lock()
+
+        # Trading hours for the current IST date, reloaded when the date changes or
+        # invalidate_trading_hours() is called after holidays or sessions are edited
+        # {'date': date, 'holiday': holiday name or None, 'sessions_by_dow': {day_of_week: [session dicts]}}
+        self.invalidate_trading_hours()
+
         logger.debug("PositionMonitor initialized")
 
     def should_start_monitoring(self) -> bool:
@@ -82,43 +116,89 @@ class PositionMonitor:
             bool: True if all conditions met, False otherwise
         """
         # 1. Check primary account exists
-        primary_account = TradingAccount.query.filter_by(
-            is_primary=True,
-            is_active=True
-        ).first()
+        primary_account = self._get_primary_account()
 
         if not primary_account:
             logger.warning("No primary account found - monitoring disabled")
             return False
 
         # 2. Check primary account connection
+        if not self._ping_primary_account(primary_account):
+            return False
+
+        # 3. Check trading hours from template
+        if not self.is_trading_hours():
+            logger.debug("Outside trading hours - monitoring disabled")
+            return False
+
+        logger.debug("All conditions met - monitoring can start")
+        return True
+
+    def _get_primary_account(self) -> Optional[Dict]:
+        """
+        Get the active primary account's connection details, cached for _primary_account_ttl.
+
+        Returns:
+            Dict with account_name, api_key and host_url, or None if there is no primary account
+        """
+        now = time.monotonic()
+        cache = self._primary_account_cache
+        if cache['ts'] and now - cache['ts'] < self._primary_account_ttl:
+            return cache['account']
+
+        primary_account = TradingAccount.query.filter_by(
+            is_primary=True,
+            is_active=True
+        ).first()
+
+        account = None
+        if primary_account:
+            account = {
+                'account_name': primary_account.account_name,
+                'api_key': primary_account.get_api_key(),
+                'host_url': primary_account.host_url
+            }
+
+        self._primary_account_cache = {'ts': now, 'account': account}
+        return account
+
+    def _ping_primary_account(self, primary_account: Dict) -> bool:
+        """
+        Ping the primary account, reusing the last result for _ping_ttl.
+
+        Args:
+            primary_account: Connection details from _get_primary_account
+
+        Returns:
+            bool: True if the account responded to ping
+        """
+        now = time.monotonic()
+        cache = self._ping_cache
+        if cache['ts'] and now - cache['ts'] < self._ping_ttl:
+            return cache['ok']
+
+        ok = False
         try:
             client = ExtendedOpenAlgoAPI(
-                api_key=primary_account.get_api_key(),
-                host=primary_account.host_url
+                api_key=primary_account['api_key'],
+                host=primary_account['host_url']
             )
             ping_response = client.ping()
 
             if ping_response.get('status') != 'success':
                 logger.warning(
-                    f"Primary account {primary_account.account_name} not connected - "
+                    f"Primary account {primary_account['account_name']} not connected - "
                     f"monitoring disabled"
                 )
-                return False
-
-            logger.debug(f"Primary account {primary_account.account_name} is connected")
+            else:
+                logger.debug(f"Primary account {primary_account['account_name']} is connected")
+                ok = True
 
         except Exception as e:
             logger.error(f"Failed to ping primary account: {e}")
-            return False
 
-        # 3. Check trading hours from template
-        if not self.is_trading_hours():
-            logger.debug("Outside trading hours - monitoring disabled")
-            return False
-
-        logger.debug("All conditions met - monitoring can start")
-        return True
+        self._ping_cache = {'ts': now, 'ok': ok}
+        return ok
 
     def is_trading_hours(self) -> bool:
         """
@@ -133,21 +213,19 @@ class PositionMonitor:
         current_time = now.time()
         day_of_week = now.weekday()  # 0=Monday, 6=Sunday
 
-        # Check if today is a market holiday
-        is_holiday = MarketHoliday.query.filter(
-            MarketHoliday.holiday_date == today
-        ).first()
+        # Holiday and sessions only change day to day - load them once per date
+        hours = self._hours_cache
+        if hours['date'] != today:
+            hours = self._load_trading_hours(today)
 
-        if is_holiday:
-            logger.debug(f"Market holiday: {is_holiday.holiday_name}")
+        # Check if today is a market holiday
+        holiday_name = hours['holiday']
+        if holiday_name is not None:
+            logger.debug(f"Market holiday: {holiday_name}")
             return False
 
         # Get trading sessions for today
-        sessions = TradingSession.query.join(TradingHoursTemplate).filter(
-            TradingSession.day_of_week == day_of_week,
-            TradingSession.is_active == True,
-            TradingHoursTemplate.is_active == True
-        ).all()
+        sessions = hours['sessions_by_dow'].get(day_of_week)
 
         if not sessions:
             logger.debug(f"No trading sessions configured for day {day_of_week}")
@@ -155,16 +233,55 @@ class PositionMonitor:
 
         # Check if current time is within any session
         for session in sessions:
-            if session.start_time <= current_time <= session.end_time:
+            if session['start_time'] <= current_time <= session['end_time']:
                 logger.debug(
-                    f"Within trading hours: {session.session_name} "
-                    f"({session.start_time} - {session.end_time})"
+                    f"Within trading hours: {session['session_name']} "
+                    f"({session['start_time']} - {session['end_time']})"
                 )
                 return True
 
         logger.debug(f"Outside all trading sessions for day {day_of_week}")
         return False
 
+    def _load_trading_hours(self, today) -> Dict:
+        """
+        Load today's holiday and all active trading sessions into the hours cache.
+
+        Args:
+            today: Current date in IST
+
+        Returns:
+            Dict: The new hours cache
+        """
+        holiday = MarketHoliday.query.filter(
+            MarketHoliday.holiday_date == today
+        ).first()
+
+        sessions = TradingSession.query.join(TradingHoursTemplate).filter(
+            TradingSession.is_active == True,
+            TradingHoursTemplate.is_active == True
+        ).all()
+
+        sessions_by_dow = {}
+        for session in sessions:
+            sessions_by_dow.setdefault(session.day_of_week, []).append({
+                'session_name': session.session_name,
+                'start_time': session.start_time,
+                'end_time': session.end_time
+            })
+
+        # Replace in one assignment so concurrent readers never see a half-filled cache
+        self._hours_cache = {
+            'date': today,
+            'holiday': holiday.holiday_name if holiday else None,
+            'sessions_by_dow': sessions_by_dow
+        }
+        return self._hours_cache
+
+    def invalidate_trading_hours(self):
+        """Drop the cached trading hours so the next check reloads them from the database"""
+        self._hours_cache = {'date': None, 'holiday': None, 'sessions_by_dow': {}}
+
     def get_open_positions(self) -> List[StrategyExecution]:
         """
         Get open positions that need WebSocket monitoring.
@@ -184,21 +301,21 @@ class PositionMonitor:
         try:
             # Query for entered positions with eager loading to avoid N+1 queries
             # This loads leg and strategy in a single query instead of separate queries per execution
+            # Rejected/cancelled orders are excluded in SQL rather than loaded and skipped
             open_executions = StrategyExecution.query.options(
                 joinedload(StrategyExecution.leg),
                 joinedload(StrategyExecution.strategy)
             ).filter(
-                StrategyExecution.status == 'entered'
+                StrategyExecution.status == 'entered',
+                or_(
+                    StrategyExecution.broker_order_status.is_(None),
+                    func.lower(StrategyExecution.broker_order_status).notin_(['rejected', 'cancelled'])
+                )
             ).all()
 
-            # Filter out rejected/cancelled orders and positions without risk management
+            # Filter out positions without risk management
             filtered_executions = []
             for execution in open_executions:
-                # Check if broker_order_status exists and is not rejected/cancelled
-                if hasattr(execution, 'broker_order_status') and execution.broker_order_status:
-                    if execution.broker_order_status.lower() in ['rejected', 'cancelled']:
-                        continue
-
                 # Check leg-level risk management (StrategyLeg)
                 leg = execution.leg
                 has_leg_sl = False
@@ -276,6 +393,7 @@ class PositionMonitor:
         logger.debug(f"Subscribing to {len(symbols_to_subscribe)} unique symbols")
 
         # Subscribe to each unique symbol
+        subscribed_ids = []
         for key, data in symbols_to_subscribe.items():
             try:
                 # Subscribe to WebSocket
@@ -287,7 +405,9 @@ class PositionMonitor:
 
                 # Update internal tracking
                 self.subscribed_symbols.add(key)
-                self.position_map[key] = data['executions']
+                self.position_map[key] = [e.id for e in data['executions']]
+                self._last_ltp.pop(key, None)  # Write the next tick for the new positions
+                subscribed_ids.extend(self.position_map[key])
 
                 logger.debug(
                     f"Subscribed to {data['symbol']} "
@@ -297,6 +417,8 @@ class PositionMonitor:
             except Exception as e:
                 logger.error(f"Failed to subscribe to {data['symbol']}: {e}")
 
+        self._mark_subscribed(subscribed_ids)
+
         logger.debug(
             f"Position monitoring active: {len(self.subscribed_symbols)} symbols, "
             f"{len(open_executions)} positions"
@@ -324,12 +446,33 @@ class PositionMonitor:
 
             self.subscribed_symbols.discard(key)
             self.position_map.pop(key, None)
+            self._last_ltp.pop(key, None)
 
             logger.debug(f"Unsubscribed from {symbol}")
 
         except Exception as e:
             logger.error(f"Error unsubscribing from {symbol}: {e}")
 
+    def _mark_subscribed(self, execution_ids: List[int]):
+        """
+        Set websocket_subscribed on executions once, when they start being monitored,
+        rather than rewriting it with every price flush.
+
+        Args:
+            execution_ids: IDs of the newly monitored executions
+        """
+        if not execution_ids:
+            return
+
+        try:
+            StrategyExecution.query.filter(
+                StrategyExecution.id.in_(execution_ids)
+            ).update({'websocket_subscribed': True}, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error marking executions as subscribed: {e}")
+            db.session.rollback()
+
     def on_order_filled(self, execution: StrategyExecution):
         """
         Called by OrderStatusPoller when an order fills.
@@ -372,7 +515,10 @@ class PositionMonitor:
         if key in self.subscribed_symbols:
             # Add to existing position tracking
             if key in self.position_map:
-                self.position_map[key].append(execution)
+                self.position_map[key].append(execution.id)
+                # The new position has no price yet: don't drop the next tick as unchanged
+                self._last_ltp.pop(key, None)
+            self._mark_subscribed([execution.id])
             logger.debug(f"Added {execution.symbol} to existing monitoring")
             return
 
@@ -386,7 +532,9 @@ class PositionMonitor:
                 })
 
                 self.subscribed_symbols.add(key)
-                self.position_map[key] = [execution]
+                self.position_map[key] = [execution.id]
+                self._last_ltp.pop(key, None)
+                self._mark_subscribed([execution.id])
 
                 logger.debug(f"New position filled with risk management - subscribed to {execution.symbol}")
 
@@ -417,11 +565,10 @@ class PositionMonitor:
             logger.info(f"[POSITION_CLOSE] Received notification for {execution.symbol} (execution_id={execution.id})")
             logger.info(f"[POSITION_CLOSE] Currently subscribed symbols: {list(self.subscribed_symbols)}")
 
-            # Remove from position map by ID (not object identity)
+            # Remove from position map by ID
             if key in self.position_map:
                 positions = self.position_map[key]
-                # Remove by ID since object instances may differ
-                self.position_map[key] = [p for p in positions if p.id != execution.id]
+                self.position_map[key] = [p for p in positions if p != execution.id]
                 remaining = len(self.position_map[key])
                 logger.info(f"[POSITION_CLOSE] Removed execution {execution.id} from position map, {remaining} remaining")
 
@@ -483,6 +630,13 @@ class PositionMonitor:
         if key not in self.position_map:
             return
 
+        # Skip flat ticks - the price on the row is already current
+        now = time.monotonic()
+        last = self._last_ltp.get(key)
+        if last is not None and last[0] == ltp and now - last[1] < self._ltp_heartbeat_interval:
+            return
+        self._last_ltp[key] = (ltp, now)
+
         # Queue for batch update instead of immediate DB write
         if self._price_update_lock:
             with self._price_update_lock:
@@ -516,30 +670,32 @@ class PositionMonitor:
             return
 
         try:
-            with self.app.app_context():
-                # Get all execution IDs that need updating
-                execution_ids = []
-                for key, data in updates_to_process.items():
-                    if key in self.position_map:
-                        execution_ids.extend([e.id for e in self.position_map[key]])
-
-                if not execution_ids:
-                    return
+            # One row per monitored execution, across all symbols
+            now = datetime.utcnow()
+            params = [
+                {
+                    'execution_id': execution_id,
+                    'ltp': data['ltp'],
+                    'updated': now
+                }
+                for key, data in updates_to_process.items()
+                for execution_id in self.position_map.get(key, ())
+            ]
 
-                # Batch update all positions in a single query
-                now = datetime.utcnow()
-                for key, data in updates_to_process.items():
-                    if key in self.position_map:
-                        position_ids = [e.id for e in self.position_map[key]]
-                        if position_ids:
-                            StrategyExecution.query.filter(
-                                StrategyExecution.id.in_(position_ids)
-                            ).update({
-                                'last_price': data['ltp'],
-                                'last_price_updated': now,
-                                'websocket_subscribed': True
-                            }, synchronize_session=False)
+            if not params:
+                return
 
+            with self.app.app_context():
+                # Batch update all positions in a single executemany. Table-level, so an
+                # execution deleted since it was subscribed is skipped rather than
+                # failing the whole flush (the ORM bulk update checks matched rows)
+                executions = StrategyExecution.__table__
+                db.session.execute(
+                    update(executions)
+                    .where(executions.c.id == bindparam('execution_id'))
+                    .values(last_price=bindparam('ltp'), last_price_updated=bindparam('updated')),
+                    params
+                )
                 db.session.commit()
                 logger.debug(f"Batch flushed {len(updates_to_process)} price updates")
 
@@ -553,7 +709,6 @@ class PositionMonitor:
 
     def _flush_thread_runner(self):
         """Background thread that periodically flushes price updates."""
-        import time
         while self.is_running:
             time.sleep(self._batch_flush_interval)
             try:
@@ -597,8 +752,6 @@ class PositionMonitor:
             websocket_manager: WebSocket manager instance (can be None or not-yet-connected)
             app: Flask app instance (for creating app context in WebSocket callbacks)
         """
-        import threading
-
         if self.is_running:
             logger.warning("Position monitor already running")
             return
@@ -667,11 +820,22 @@ class PositionMonitor:
         self.subscribed_symbols.clear()
         self.position_map.clear()
         self._pending_price_updates.clear()
+        self._last_ltp.clear()
+        self._primary_account_cache = {'ts': 0.0, 'account': None}
+        self._ping_cache = {'ts': 0.0, 'ok': False}
+        self._refresh_interval = self._refresh_min_interval
+        self._refresh_prev_ids = set()
+        self._last_refresh = 0.0
+        self.invalidate_trading_hours()
 
     def refresh_positions(self):
         """
         Refresh position subscriptions by re-scanning database.
         Called periodically to catch any positions that might have been missed.
+
+        Safe to call often: calls within _refresh_interval of the last rescan
+        return without one, and the interval backs off while the open
+        positions stay the same.
         """
         if not self.is_running:
             logger.debug("Position monitor not running - skipping refresh")
@@ -681,14 +845,30 @@ class PositionMonitor:
             logger.debug("No WebSocket manager - skipping refresh")
             return
 
+        # Claim the rescan, so concurrent callers don't each run one
+        with self._refresh_lock:
+            now = time.monotonic()
+            if now - self._last_refresh < self._refresh_interval:
+                return
+            self._last_refresh = now
+
         try:
             # Get current open positions from database
             open_executions = self.get_open_positions()
 
+            current_ids = {execution.id for execution in open_executions}
+            if current_ids == self._refresh_prev_ids:
+                self._refresh_interval = min(self._refresh_interval * self._refresh_backoff_factor,
+                                             self._refresh_max_interval)
+            else:
+                self._refresh_interval = self._refresh_min_interval
+            self._refresh_prev_ids = current_ids
+
             if not open_executions:
                 return
 
             # Subscribe to any new positions
+            new_ids = []
             for execution in open_executions:
                 key = f"{execution.symbol}_{execution.exchange}"
 
@@ -696,8 +876,10 @@ class PositionMonitor:
                 if key in self.subscribed_symbols:
                     # Make sure it's in the position map
                     if key in self.position_map:
-                        if execution not in self.position_map[key]:
-                            self.position_map[key].append(execution)
+                        if execution.id not in self.position_map[key]:
+                            self.position_map[key].append(execution.id)
+                            self._last_ltp.pop(key, None)  # Write the next tick for it
+                            new_ids.append(execution.id)
                     continue
 
                 # Subscribe to new symbol
@@ -708,9 +890,13 @@ class PositionMonitor:
                 })
 
                 self.subscribed_symbols.add(key)
-                self.position_map[key] = [execution]
+                self.position_map[key] = [execution.id]
+                self._last_ltp.pop(key, None)
+                new_ids.append(execution.id)
                 logger.debug(f"Refresh: Subscribed to {execution.symbol}")
 
+            self._mark_subscribed(new_ids)
+
         except Exception as e:
             logger.error(f"Error refreshing positions: {e}")
 
@@ -74,7 +74,7 @@ class StrategyExecutor:
 
         if use_margin_calculator:
             from app.utils.margin_calculator import MarginCalculator
-            self.margin_calculator = MarginCalculator(strategy.user_id)
+            self.margin_calculator = MarginCalculator.for_user(strategy.user_id)
             margin_type = "cash" if self.margin_source == 'cash' else "available"
             logger.debug(f"Strategy {strategy.id} ({strategy.name}): Using {self.margin_percentage*100}% {margin_type} margin based on risk_profile '{strategy.risk_profile}'")
 
@@ -317,6 +317,10 @@ class StrategyExecutor:
 
         print(f"[MAIN SESSION] ========== COMPLETED ==========")
 
+        # Funds are only fetched while sizing entries; release the broker connections
+        if self.margin_calculator:
+            self.margin_calculator.close()
+
         return results
 
     def _initialize_tsl_values(self, results: List[Dict]):
@@ -1544,7 +1548,8 @@ class StrategyExecutor:
                 margin_percentage=self.margin_percentage,
                 available_margin=available_margin,
                 is_expiry=self.is_expiry_override,
-                margin_source=self.margin_source
+                margin_source=self.margin_source,
+                include_calculation=False
             )
 
             logger.debug(f"[QTY CALC DEBUG] Calculated optimal lots: {optimal_lots}")
@@ -1811,7 +1816,8 @@ class StrategyExecutor:
             margin_percentage=self.margin_percentage,
             available_margin=available_margin,
             is_expiry=self.is_expiry_override,
-            margin_source=self.margin_source
+            margin_source=self.margin_source,
+            include_calculation=False
         )
 
         if optimal_lots > 0:
@@ -1865,7 +1871,8 @@ class StrategyExecutor:
             margin_percentage=self.margin_percentage,
             available_margin=available_margin,
             is_expiry=self.is_expiry_override,
-            margin_source=self.margin_source
+            margin_source=self.margin_source,
+            include_calculation=False
         )
 
         if optimal_lots > 0:
@@ -46,6 +46,8 @@ class WebSocketDataProcessor:
         self.quote_handlers = []
         self.depth_handlers = []
         self.ltp_handlers = []
+        # symbol -> handler, for depth consumers that own specific symbols
+        self.symbol_depth_handlers = {}
 
     def register_quote_handler(self, handler):
         self.quote_handlers.append(handler)
@@ -56,6 +58,12 @@ class WebSocketDataProcessor:
     def register_ltp_handler(self, handler):
         self.ltp_handlers.append(handler)
 
+    def register_symbol_depth_handler(self, symbol, handler):
+        self.symbol_depth_handlers[symbol] = handler
+
+    def unregister_symbol_depth_handler(self, symbol):
+        self.symbol_depth_handlers.pop(symbol, None)
+
     def on_data_received(self, data):
         """
         Process incoming WebSocket data based on subscription mode.
@@ -102,6 +110,14 @@ class WebSocketDataProcessor:
 
     def handle_depth_update(self, data):
         """Process depth mode data (option strikes)"""
+        # Routed straight to the symbol's owner, then to mode-wide handlers
+        handler = self.symbol_depth_handlers.get(data.get('symbol'))
+        if handler is not None:
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error(f"Error in depth handler for {data.get('symbol')}: {e}")
+
         for handler in self.depth_handlers:
             try:
                 handler(data)
@@ -317,6 +333,28 @@ class ProfessionalWebSocketManager:
             logger.error(f"[WS_SUBSCRIBE] Error: {e}")
             return False
 
+    def subscribe_bulk(self, subscriptions: List[Dict]):
+        """
+        Subscribe to many symbols, possibly in different modes, in one pass
+        subscriptions: list of dicts with 'symbol', 'exchange' and 'mode' keys
+        Issues one subscribe_batch call per mode instead of one per symbol
+        """
+        by_mode = {}
+        for subscription in subscriptions:
+            symbol = subscription.get('symbol')
+            exchange = subscription.get('exchange')
+            if not symbol or not exchange:
+                logger.error(f"[WS_BULK] Missing symbol or exchange in {subscription}")
+                continue
+            by_mode.setdefault(subscription.get('mode', 'ltp'), []).append(
+                {'symbol': symbol, 'exchange': exchange}
+            )
+
+        success = bool(by_mode)
+        for mode, instruments in by_mode.items():
+            success = self.subscribe_batch(instruments, mode) and success
+        return success
+
     def unsubscribe_batch(self, instruments: List[Dict], mode: str = 'ltp'):
         """Unsubscribe from multiple instruments"""
         try:
@@ -456,6 +494,14 @@ class ProfessionalWebSocketManager:
         elif mode == 'ltp':
             self.data_processor.register_ltp_handler(handler)
 
+    def register_symbol_handler(self, symbol: str, handler: Callable):
+        """Register depth data handler that only receives updates for one symbol"""
+        self.data_processor.register_symbol_depth_handler(symbol, handler)
+
+    def unregister_symbol_handler(self, symbol: str):
+        """Remove a handler added with register_symbol_handler"""
+        self.data_processor.unregister_symbol_depth_handler(symbol)
+
     def get_ltp(self):
         """
         Get cached LTP data from OpenAlgo SDK with zero-value protection.
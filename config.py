@@ -111,6 +111,11 @@ class Config:
     PING_MONITORING_ENABLED = os.environ.get('PING_MONITORING_ENABLED', 'true').lower() == 'true'
     PING_MAX_FAILURES = int(os.environ.get('PING_MAX_FAILURES', 3))
     PING_QUIET_MODE = os.environ.get('PING_QUIET_MODE', 'false').lower() == 'true'  # Reduces log noise
+
+    # Order status polling configuration
+    ORDER_POLL_MAX_AGE = int(os.environ.get('ORDER_POLL_MAX_AGE', 28800))  # Seconds before an open order is dropped
+    ORDER_POLL_MAX_CHECKS = int(os.environ.get('ORDER_POLL_MAX_CHECKS', 0))  # 0 = no limit
+    ORDER_POLL_MAX_INTERVAL = float(os.environ.get('ORDER_POLL_MAX_INTERVAL', 10))  # Slowest re-check of an open order
     
 class DevelopmentConfig(Config):
     DEBUG = True
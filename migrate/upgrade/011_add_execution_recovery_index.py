@@ -0,0 +1,38 @@
+"""
+Migration: Add index for pending order recovery
+
+OrderStatusPoller.recover_pending_orders (run on startup) and
+sync_all_pending_orders look up executions by status with an order_id set.
+A (status, order_id) index lets those queries read only the pending rows
+instead of scanning every historical execution.
+"""
+
+from sqlalchemy import text
+
+
+INDEX_NAME = 'ix_strategy_executions_status_order_id'
+
+
+def upgrade(db):
+    """Add (status, order_id) index on strategy_executions"""
+
+    result = db.session.execute(text(
+        f"SELECT name FROM sqlite_master WHERE type='index' AND name='{INDEX_NAME}'"
+    ))
+    if result.fetchone() is not None:
+        print(f"  Index {INDEX_NAME} already exists, skipping")
+        return
+
+    db.session.execute(text(
+        f'CREATE INDEX {INDEX_NAME} ON strategy_executions(status, order_id)'
+    ))
+    db.session.commit()
+    print(f"  Created index {INDEX_NAME}")
+
+
+def downgrade(db):
+    """Remove (status, order_id) index"""
+
+    db.session.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+    db.session.commit()
+    print(f"  Dropped index {INDEX_NAME}")
@@ -113,12 +113,8 @@ def test_websocket_flow():
             metrics = ws_manager.connection_pool.get('metrics', {}) if ws_manager.connection_pool else {}
             msg_count = metrics.get('messages_received', 0)
             
-            # Get a sample option data
-            sample_data = None
-            for strike_data in option_manager.option_data.values():
-                if strike_data['tag'] == 'ATM':
-                    sample_data = strike_data
-                    break
+            # Get a sample option data (prices live in the depth array, not option_data)
+            sample_data = option_manager.get_option_by_tag('ATM')
             
             if sample_data:
                 ce_ltp = sample_data['ce_data'].get('ltp', 0)
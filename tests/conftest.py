@@ -0,0 +1,65 @@
+"""
+Shared pytest fixtures: an app on a throwaway in-memory database
+"""
+
+import os
+import sys
+import tempfile
+
+from cryptography.fernet import Fernet
+
+# Must be set before config.py is imported, so tests never touch a real database
+TEST_DIR = tempfile.mkdtemp(prefix='algomirror-test-')
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('SESSION_FILE_DIR', os.path.join(TEST_DIR, 'flask_session'))
+os.environ.setdefault('ENCRYPTION_KEY', Fernet.generate_key().decode())
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app import create_app, db
+from app.models import User, TradingAccount, Strategy, StrategyLeg
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Flask app (tables are created by create_app), logging to TEST_DIR/logs instead of the repo"""
+    cwd = os.getcwd()
+    os.chdir(TEST_DIR)  # setup_logging opens logs/algomirror.log relative to the working directory
+    try:
+        return create_app()
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def app_ctx(app):
+    """App context with empty tables, cleared again after the test"""
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+
+@pytest.fixture
+def trading_setup(app_ctx):
+    """A user with one trading account and a one-leg strategy"""
+    user = User(username='tester', email='tester@example.com')
+    user.set_password('Passw0rd!test')
+    db.session.add(user)
+    db.session.flush()
+
+    account = TradingAccount(user_id=user.id, account_name='test-account', broker_name='test',
+                             host_url='http://127.0.0.1:5000', websocket_url='ws://127.0.0.1:8765',
+                             is_active=True)
+    account.set_api_key('test-api-key')
+    strategy = Strategy(user_id=user.id, name='Test Strategy')
+    db.session.add_all([account, strategy])
+    db.session.flush()
+
+    leg = StrategyLeg(strategy_id=strategy.id, leg_number=1, action='BUY')
+    db.session.add(leg)
+    db.session.commit()
+    return {'user': user, 'account': account, 'strategy': strategy, 'leg': leg}
@@ -0,0 +1,24 @@
+"""
+Default trading hours and holiday seeding tests on an in-memory database
+
+Run: pytest tests/test_init_trading_hours.py
+"""
+
+from app import db
+from app.models import MarketHoliday
+from app.utils.init_trading_hours import (
+    NSE_HOLIDAYS_2025, NSE_HOLIDAYS_2026, init_trading_hours_defaults, _get_initialized_template
+)
+
+
+def test_warm_start_gate_needs_every_nse_default(app_ctx):
+    """A non-NSE holiday on a default date doesn't count as that NSE default being present"""
+    result = init_trading_hours_defaults()
+    assert result['holidays_added'] == len(NSE_HOLIDAYS_2025) + len(NSE_HOLIDAYS_2026)
+    assert _get_initialized_template() is result['template']
+
+    holiday = MarketHoliday.query.filter_by(holiday_date=NSE_HOLIDAYS_2025[0].holiday_date).one()
+    holiday.market = 'BSE'
+    db.session.commit()
+
+    assert _get_initialized_template() is None
@@ -0,0 +1,64 @@
+"""
+MarginCalculator sharing tests with a stub OpenAlgo client (no broker needed)
+
+Run: pytest tests/test_margin_calculator.py
+"""
+
+import pytest
+
+import app.utils.margin_calculator as calculator_module
+from app.utils.margin_calculator import MarginCalculator
+
+
+class StubClient:
+    """Stands in for ExtendedOpenAlgoAPI; every funds() call returns the next cash balance"""
+
+    created = []
+
+    def __init__(self, api_key=None, host=None, **kwargs):
+        self.closed = False
+        StubClient.created.append(self)
+
+    def funds(self):
+        cash = 100000.0 * len(StubClient.created)
+        return {'status': 'success', 'data': {'availablecash': cash}}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    StubClient.created = []
+    monkeypatch.setattr(calculator_module, 'ExtendedOpenAlgoAPI', StubClient)
+    yield StubClient
+    MarginCalculator.clear_cache()
+
+
+def test_callers_share_settings_but_not_funds(app_ctx, trading_setup, stub_client):
+    """A second caller within FUNDS_CACHE_TTL fetches its own funds instead of reusing the first's"""
+    user_id, account = trading_setup['user'].id, trading_setup['account']
+    first = MarginCalculator.for_user(user_id)
+    assert first.get_cash_margin(account) == 100000.0
+
+    second = MarginCalculator.for_user(user_id)
+    assert second.margin_requirements is first.margin_requirements
+    assert second.get_cash_margin(account) == 200000.0
+
+    first.close()
+    second.close()
+    assert [client.closed for client in stub_client.created] == [True, True]
+
+
+def test_force_refresh_bypasses_funds_cache(app_ctx, trading_setup, stub_client):
+    """Lookups reuse a recent funds response only when force_refresh is off"""
+    calculator = MarginCalculator.for_user(trading_setup['user'].id)
+    account = trading_setup['account']
+    calls = []
+    calculator._get_client(account).funds = lambda: calls.append(1) or {
+        'status': 'success', 'data': {'availablecash': 1000.0 * len(calls)}}
+
+    assert calculator.get_cash_margin(account) == 1000.0
+    assert calculator.get_cash_margin(account, force_refresh=False) == 1000.0
+    assert calculator.get_cash_margin(account) == 2000.0
+    calculator.close()
@@ -0,0 +1,134 @@
+"""
+OrderStatusPoller tests with a stub OpenAlgo client (no broker needed)
+
+Run: pytest tests/test_order_status_poller.py
+"""
+
+import time
+
+import pytest
+
+import app.utils.order_status_poller as poller_module
+from app import db
+from app.models import StrategyExecution
+from app.utils.order_status_poller import OrderStatusPoller
+
+
+class StubBroker:
+    """Stands in for ExtendedOpenAlgoAPI; counts calls per endpoint"""
+
+    def __init__(self, book_rows=None, status_rows=None):
+        self.book_rows = book_rows or {}      # order_id -> orderbook row
+        self.status_rows = status_rows or {}  # order_id -> orderstatus data
+        self.calls = {'orderbook': 0, 'orderstatus': 0}
+
+    def client(self, api_key=None, host=None, **kwargs):
+        return self
+
+    def orderbook(self):
+        self.calls['orderbook'] += 1
+        return {'status': 'success', 'data': {'orders': list(self.book_rows.values()), 'statistics': {}}}
+
+    def orderstatus(self, order_id=None, strategy=None):
+        self.calls['orderstatus'] += 1
+        return {'status': 'success', 'data': self.status_rows[order_id]}
+
+    def close(self):
+        pass
+
+
+class StubPositionMonitor:
+    def on_order_filled(self, execution):
+        pass
+
+    def on_position_closed(self, execution):
+        pass
+
+    def on_order_cancelled(self, execution):
+        pass
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    stub = StubBroker()
+    monkeypatch.setattr(poller_module, 'ExtendedOpenAlgoAPI', stub.client)
+    monkeypatch.setattr(poller_module, 'get_position_monitor', StubPositionMonitor)
+    return stub
+
+
+@pytest.fixture
+def poller(app_ctx):
+    instance = OrderStatusPoller()
+    instance.set_flask_app(app_ctx)
+    yield instance
+    instance.stop()
+
+
+def add_pending_orders(poller, setup, order_ids):
+    """Create pending entry executions for order_ids and queue them; returns their ids"""
+    executions = [
+        StrategyExecution(strategy_id=setup['strategy'].id, account_id=setup['account'].id,
+                          leg_id=setup['leg'].id, order_id=order_id, symbol='NIFTY', exchange='NFO',
+                          quantity=75, status='pending')
+        for order_id in order_ids
+    ]
+    db.session.add_all(executions)
+    db.session.commit()
+    for execution in executions:
+        poller.add_order(execution.id, setup['account'], execution.order_id, setup['strategy'].name)
+    # Let them all fall due, so the first poll checks them as one batch
+    time.sleep(poller.POLL_BACKOFF_BASE + 0.1)
+    return [execution.id for execution in executions]
+
+
+def wait_for_empty_queue(poller, timeout):
+    deadline = time.monotonic() + timeout
+    while poller.get_status()['pending_orders_count'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return poller.get_status()['pending_orders_count'] == 0
+
+
+def complete(order_id, average_price):
+    return {'orderid': order_id, 'order_status': 'complete', 'average_price': average_price}
+
+
+def test_orders_missing_from_orderbook_fall_back_to_orderstatus(poller, broker, trading_setup):
+    """Orders the orderbook doesn't list are checked with orderstatus, not another orderbook call"""
+    broker.status_rows = {'A1': complete('A1', 100.0), 'A2': complete('A2', 101.0)}
+    execution_ids = add_pending_orders(poller, trading_setup, ['A1', 'A2'])
+
+    poller.start()
+    assert wait_for_empty_queue(poller, timeout=10)
+
+    assert broker.calls['orderbook'] == 1
+    assert broker.calls['orderstatus'] == 2
+    db.session.expire_all()
+    assert [db.session.get(StrategyExecution, i).status for i in execution_ids] == ['entered', 'entered']
+
+
+def test_orders_waiting_for_average_price_use_orderstatus(poller, broker, trading_setup):
+    """Orders re-checking for average_price go to orderstatus without re-fetching the orderbook"""
+    broker.book_rows = {'B1': complete('B1', 0), 'B2': complete('B2', 0)}
+    broker.status_rows = {'B1': complete('B1', 100.0), 'B2': complete('B2', 101.0)}
+    execution_ids = add_pending_orders(poller, trading_setup, ['B1', 'B2'])
+
+    poller.start()
+    assert wait_for_empty_queue(poller, timeout=10)
+
+    assert broker.calls['orderbook'] == 1
+    assert broker.calls['orderstatus'] == 2
+    db.session.expire_all()
+    assert [db.session.get(StrategyExecution, i).entry_price for i in execution_ids] == [100.0, 101.0]
+
+
+def test_rate_limited_order_still_times_out(poller, broker, trading_setup):
+    """An order deferred by the rate limit is dropped once it passes max_age_seconds"""
+    [execution_id] = add_pending_orders(poller, trading_setup, ['C1'])
+    order_info = poller.pending_orders[execution_id]
+    poller.max_age_seconds = 0
+    poller.last_check_time[order_info.account_key] = time.monotonic_ns()  # Account just used its slot
+
+    poller._check_order_status(execution_id, order_info, app=None)
+
+    assert execution_id not in poller.pending_orders
+    assert broker.calls == {'orderbook': 0, 'orderstatus': 0}
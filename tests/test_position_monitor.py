@@ -0,0 +1,123 @@
+"""
+PositionMonitor price-update tests on an in-memory database (no WebSocket needed)
+
+Run: pytest tests/test_position_monitor.py
+"""
+
+import threading
+from datetime import datetime, time
+
+import pytest
+import pytz
+
+from app import db
+from app.models import MarketHoliday, StrategyExecution, TradingHoursTemplate, TradingSession
+from app.utils.position_monitor import PositionMonitor
+
+
+@pytest.fixture
+def monitor(app_ctx):
+    """The PositionMonitor singleton with its tracking state reset around the test"""
+    instance = PositionMonitor()
+    instance.app = app_ctx
+    instance._price_update_lock = threading.Lock()
+    yield instance
+    instance.subscribed_symbols.clear()
+    instance.position_map.clear()
+    instance._pending_price_updates.clear()
+    instance._last_ltp.clear()
+    instance.invalidate_trading_hours()
+    instance.app = None
+
+
+def add_open_executions(setup, count, symbol='NIFTY'):
+    executions = [
+        StrategyExecution(strategy_id=setup['strategy'].id, account_id=setup['account'].id,
+                          leg_id=setup['leg'].id, order_id=f'{symbol}-{n}', symbol=symbol, exchange='NFO',
+                          quantity=75, status='entered', entry_price=100.0)
+        for n in range(count)
+    ]
+    db.session.add_all(executions)
+    db.session.commit()
+    return [execution.id for execution in executions]
+
+
+def last_prices(execution_ids):
+    db.session.expire_all()
+    return [db.session.get(StrategyExecution, execution_id).last_price for execution_id in execution_ids]
+
+
+def test_flush_skips_deleted_executions(monitor, trading_setup):
+    """A monitored execution deleted from the DB doesn't stop the others' prices updating"""
+    execution_ids = add_open_executions(trading_setup, 2)
+    deleted_id = execution_ids[-1] + 100  # e.g. removed by a strategy or account delete
+    monitor.position_map['NIFTY_NFO'] = execution_ids + [deleted_id]
+
+    monitor.update_last_price('NIFTY', 'NFO', 105.5)
+    monitor._flush_pending_updates()
+
+    assert last_prices(execution_ids) == [105.5, 105.5]
+    assert db.session.get(StrategyExecution, deleted_id) is None
+
+
+def test_unchanged_tick_is_written_for_newly_added_position(monitor, trading_setup):
+    """A position joining a subscribed symbol gets the next tick even if the price hasn't moved"""
+    first_id, second_id = add_open_executions(trading_setup, 2)
+    trading_setup['strategy'].max_loss = 5000  # Only positions with risk management are monitored
+    db.session.commit()
+    monitor.is_running = True
+    monitor.subscribed_symbols.add('NIFTY_NFO')
+    monitor.position_map['NIFTY_NFO'] = [first_id]
+    try:
+        monitor.update_last_price('NIFTY', 'NFO', 105.5)
+        monitor._flush_pending_updates()
+
+        monitor.on_order_filled(db.session.get(StrategyExecution, second_id))
+        monitor.update_last_price('NIFTY', 'NFO', 105.5)
+        monitor._flush_pending_updates()
+    finally:
+        monitor.is_running = False
+
+    assert last_prices([first_id, second_id]) == [105.5, 105.5]
+
+
+def test_refresh_positions_rescans_once_per_interval(monitor, monkeypatch):
+    """Any number of callers share one rescan per refresh interval, which backs off while unchanged"""
+    scans = []
+    monkeypatch.setattr(monitor, 'get_open_positions', lambda: scans.append(1) or [])
+    monkeypatch.setattr(monitor, 'websocket_manager', object())
+    monitor.is_running = True
+    try:
+        monitor.refresh_positions()
+        monitor.refresh_positions()  # e.g. a second dashboard's risk status stream
+        assert len(scans) == 1
+
+        monitor._last_refresh -= monitor._refresh_interval
+        monitor.refresh_positions()
+        assert len(scans) == 2
+        assert monitor._refresh_interval == 5.0 * 1.5 * 1.5  # No open positions either time
+    finally:
+        monitor.is_running = False
+        monitor._refresh_interval = monitor._refresh_min_interval
+        monitor._refresh_prev_ids = set()
+        monitor._last_refresh = 0.0
+
+
+def test_holiday_added_today_applies_after_invalidate(monitor):
+    """Trading hours cached for today are reloaded once a holiday is added"""
+    today = datetime.now(pytz.timezone('Asia/Kolkata')).date()
+    template = TradingHoursTemplate(name='Always Open', market='NSE', is_active=True)
+    db.session.add(template)
+    db.session.flush()
+    db.session.add(TradingSession(template_id=template.id, session_name='All Day', day_of_week=today.weekday(),
+                                  start_time=time.min, end_time=time.max, is_active=True))
+    db.session.commit()
+    monitor.invalidate_trading_hours()
+    assert monitor.is_trading_hours()
+
+    db.session.add(MarketHoliday(holiday_date=today, holiday_name='Emergency Closure', market='NSE'))
+    db.session.commit()
+    assert monitor.is_trading_hours()  # Still today's cached hours
+
+    monitor.invalidate_trading_hours()
+    assert not monitor.is_trading_hours()